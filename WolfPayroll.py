@@ -0,0 +1,513 @@
+import tkinter as tk
+from tkinter import filedialog, ttk
+import argparse
+import os
+from WolfPayrollBatch import parse_rows, parse_records, apply_operations
+from WolfPayrollCalendar import LocationRegistry, DATA_DIRECTORY
+from WolfPayrollConcurrency import LocationLockedError
+from WolfPayrollEntryGrid import BatchEntryGrid
+from WolfPayrollExport import export_periods
+from WolfPayrollGrid import VirtualGrid
+from WolfPayrollHeatmap import CoverageHeatmap
+from WolfPayrollDays import parse_day, format_day, get_week_start
+from WolfPayrollMetrics import default_metrics, timed
+from WolfPayrollTransaction import TransactionError
+from WolfPayrollWorker import BackgroundWorker, JobCancelled
+
+class PayrollApp:
+    def __init__(self, root, registry, location_key, metrics=None):
+        self.registry = registry
+        self.metrics = metrics if metrics is not None else default_metrics
+        self.payroll_calendar = None
+        self.closing = False
+
+        self.root = root
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.label_employee_id = tk.Label(root, text="Employee ID")
+        self.label_employee_id.grid(row=0, column=0, padx=10, pady=5)
+        self.entry_employee_id = tk.Entry(root)
+        self.entry_employee_id.grid(row=0, column=1, padx=10, pady=5, sticky="W")
+        
+        self.label_employee_id_2 = tk.Label(root, text="Employee ID 2")
+        self.label_employee_id_2.grid(row=0, column=2, padx=10, pady=5)
+        self.entry_employee_id_2 = tk.Entry(root)
+        self.entry_employee_id_2.grid(row=0, column=3, padx=10, pady=5, sticky="W")
+
+        self.label_hours = tk.Label(root, text="Hours")
+        self.label_hours.grid(row=1, column=0, padx=10, pady=5)
+        self.entry_hours = tk.Entry(root)
+        self.entry_hours.grid(row=1, column=1, padx=10, pady=5, sticky="W")
+
+        self.label_location = tk.Label(root, text="Location")
+        self.label_location.grid(row=1, column=2, padx=10, pady=5)
+        self.location_key = tk.StringVar(root, value=location_key)
+        self.option_location = tk.OptionMenu(root, self.location_key, *registry.keys(), command=self.select_location)
+        self.option_location.grid(row=1, column=3, padx=10, pady=5, sticky="W")
+
+        self.label_date = tk.Label(root, text="Date: MM/DD/YYYY")
+        self.label_date.grid(row=2, column=0, padx=10, pady=5)
+        self.entry_date = tk.Entry(root)
+        self.entry_date.grid(row=2, column=1, padx=10, pady=5, sticky="W")
+
+        self.label_date_2 = tk.Label(root, text="Date 2: MM/DD/YYYY")
+        self.label_date_2.grid(row=2, column=2, padx=10, pady=5)
+        self.entry_date_2 = tk.Entry(root)
+        self.entry_date_2.grid(row=2, column=3, padx=10, pady=5, sticky="W")
+
+        self.button_batch_entry = tk.Button(root, text="Batch Entry", command=self.toggle_batch_entry)
+        self.button_batch_entry.grid(row=2, column=4, padx=10, pady=5)
+
+        self.button_import = tk.Button(root, text="Import CSV", command=self.import_adjustments)
+        self.button_import.grid(row=2, column=5, padx=10, pady=5)
+
+        self.button_lock_period = tk.Button(root, text="Lock Period", command=self.lock_period)
+        self.button_lock_period.grid(row=2, column=6, padx=10, pady=5)
+
+        self.button_add_hours = tk.Button(root, text="Add Hours", command=self.add_hours)
+        self.button_add_hours.grid(row=3, column=0, padx=10, pady=5)
+        
+        self.button_switch_shifts = tk.Button(root, text="Switch Shifts", command=self.switch_shifts)
+        self.button_switch_shifts.grid(row=3, column=1, padx=10, pady=5)
+
+        self.button_remove_hours = tk.Button(root, text="Remove Hours", command=self.remove_hours)
+        self.button_remove_hours.grid(row=3, column=2, padx=10, pady=5)
+
+        self.button_previous_pay_period = tk.Button(root, text="Previous Pay Period", command=lambda: self.update_pay_period('previous'))
+        self.button_previous_pay_period.grid(row=3, column=3, padx=10, pady=5)
+
+        self.button_next_pay_period = tk.Button(root, text="Next Pay Period", command=lambda: self.update_pay_period('next'))
+        self.button_next_pay_period.grid(row=3, column=4, padx=10, pady=5)
+
+        self.button_export = tk.Button(root, text="Export", command=self.export_period)
+        self.button_export.grid(row=3, column=5, padx=10, pady=5)
+
+        self.button_diagnostics = tk.Button(root, text="Diagnostics", command=self.toggle_diagnostics)
+        self.button_diagnostics.grid(row=3, column=6, padx=10, pady=5)
+
+        self.label_search = tk.Label(root, text="Search")
+        self.label_search.grid(row=0, column=4, padx=10, pady=5)
+        self.search_query = tk.StringVar(root, value="")
+        self.search_query.trace_add("write", lambda *args: self.filter_employees())
+        self.entry_search = tk.Entry(root, textvariable=self.search_query)
+        self.entry_search.grid(row=0, column=5, columnspan=2, padx=10, pady=5, sticky="W")
+
+        self.grid_payroll = VirtualGrid(root, visible_rows=20, metrics=self.metrics)
+        self.grid_payroll.grid(row=4, column=0, columnspan=6, padx=10, pady=5, sticky="nsew")
+        self.grid_payroll.tag_configure("overtime", background="#f8d7da")
+
+        self.text_pay_period = tk.Text(root, height=1, width=34)
+        self.text_pay_period.grid(row=5, column=0, columnspan=2, padx=10, pady=5)
+
+        self.label_overtime = tk.Label(root, text="", fg="red")
+        self.label_overtime.grid(row=5, column=2, columnspan=4, padx=10, pady=5, sticky="W")
+
+        self.heatmap_coverage = CoverageHeatmap(root)
+        self.heatmap_coverage.grid(row=6, column=0, columnspan=6, padx=10, pady=5, sticky="W")
+
+        # Hidden until the Diagnostics button is pressed; refreshed once a second while shown
+        self.text_diagnostics = tk.Text(root, height=12, width=90, font=("Courier", 9))
+        self.diagnostics_visible = False
+
+        # Loads, imports and exports run on the worker thread; edits wait until it is idle
+        self.worker = BackgroundWorker(root, on_progress=self.on_job_progress)
+        self.progress_job = ttk.Progressbar(root, length=200, mode="determinate", maximum=100)
+        self.progress_job.grid(row=8, column=0, columnspan=2, padx=10, pady=5, sticky="W")
+        self.label_job = tk.Label(root, text="")
+        self.label_job.grid(row=8, column=2, columnspan=3, padx=10, pady=5, sticky="W")
+        self.button_cancel = tk.Button(root, text="Cancel", command=self.worker.cancel_all, state=tk.DISABLED)
+        self.button_cancel.grid(row=8, column=5, padx=10, pady=5)
+
+        self.entry_batch = BatchEntryGrid(root, on_submit=self.submit_batch)
+        self.batch_entry_visible = False
+
+        # Change events only mark rows and days dirty; one idle callback redraws them all
+        self.dirty_rows = set()
+        self.dirty_days = set()
+        self.redraw_pending = False
+
+        self.displayed_period_index = None
+        self.current_location_key = None
+        self.select_location(location_key)
+
+    def select_location(self, location_key):
+        # Each location is loaded the first time it is selected and kept open afterwards.
+        # The very first one loads before the window opens; later ones load on the worker.
+        if not self.check_idle():
+            self.location_key.set(self.current_location_key)
+        elif self.payroll_calendar is None or location_key in self.registry.calendars:
+            self.show_location(location_key, self.registry.get(location_key))
+        else:
+            self.start_job("Loading location", load_location, self.registry, location_key,
+                           on_done=lambda payroll_calendar: self.show_location(location_key, payroll_calendar),
+                           on_finish=lambda: self.location_key.set(self.current_location_key))
+
+    def show_location(self, location_key, payroll_calendar):
+        if self.payroll_calendar is not None:
+            self.payroll_calendar.remove_listener(self.on_payroll_change)
+        self.payroll_calendar = payroll_calendar
+        self.current_location_key = location_key
+        self.location_key.set(location_key)
+        self.payroll_calendar.add_listener(self.on_payroll_change)
+        self.root.title(f"Wolf Payroll - {self.payroll_calendar.location}")
+        self.update_payroll_display()
+
+    def check_idle(self):
+        if self.closing:
+            return False
+        if self.worker.is_busy():
+            print("Please wait for the current job to finish or cancel it.")
+            return False
+        return True
+
+    def start_job(self, name, function, *args, on_done=None, on_finish=None, cancelled_message=None):
+        # on_finish runs however the job ends, before on_done sees the result
+        def finish(message):
+            self.label_job.config(text=message)
+            self.progress_job["value"] = 0
+            self.button_cancel.config(state=tk.DISABLED)
+            if on_finish is not None:
+                on_finish()
+
+        def done(result):
+            finish(f"{name} finished.")
+            if on_done is not None:
+                on_done(result)
+
+        def failed(error):
+            print(f"Error in {name.lower()}: {error}")
+            finish(f"{name} failed: {error}")
+
+        self.label_job.config(text=f"{name}...")
+        self.button_cancel.config(state=tk.NORMAL)
+        cancelled_message = cancelled_message or f"{name} cancelled."
+        self.worker.submit(name, function, *args, on_done=done, on_error=failed, on_cancel=lambda: finish(cancelled_message))
+
+    def on_job_progress(self, job, done, total, message):
+        self.progress_job["value"] = 100.0 * done / total if total else 0
+        self.label_job.config(text=f"{job.name}: {message or f'{done} of {total}'}")
+
+    def toggle_batch_entry(self):
+        self.batch_entry_visible = not self.batch_entry_visible
+        if self.batch_entry_visible:
+            self.entry_batch.grid(row=9, column=0, columnspan=7, padx=10, pady=5, sticky="W")
+        else:
+            self.entry_batch.grid_remove()
+
+    def submit_batch(self):
+        if not self.check_idle():
+            return
+        operations, errors = parse_records(self.entry_batch.get_records(), self.payroll_calendar)
+        if not operations and not errors:
+            print("No batch rows to submit.")
+            return
+        try:
+            if errors:
+                raise TransactionError(errors)
+            transaction = self.payroll_calendar.transaction()
+            transaction.extend(operations)
+            days_changed = transaction.commit()
+        except TransactionError as e:
+            for error in e.errors:
+                print(error)
+            print("Batch not applied.")
+            return
+        except Exception as e:
+            print(f"Error applying batch: {e}")
+            return
+        self.entry_batch.clear()
+        print(f"Applied {len(operations)} batch rows; {days_changed} days changed.")
+
+    def import_adjustments(self):
+        if not self.check_idle():
+            return
+        path = filedialog.askopenfilename(filetypes=[("CSV", "*.csv")])
+        if not path:
+            return
+        # The grid is redrawn once when the import ends instead of once per edited row
+        payroll_calendar = self.payroll_calendar
+        payroll_calendar.remove_listener(self.on_payroll_change)
+
+        def finish_import():
+            if payroll_calendar is self.payroll_calendar:
+                payroll_calendar.add_listener(self.on_payroll_change)
+                self.update_payroll_display()
+
+        def report(summary):
+            print(f"Imported {summary['add'] + summary['remove'] + summary['switch']} rows: {summary['employees_touched']} employees changed, "
+                  f"{len(summary['warnings'])} rows rejected.")
+            for warning in summary['warnings'][:20]:
+                print(f"rejected: {warning}")
+
+        # Rows are only written once all of them are checked, so a cancelled import applies nothing
+        self.start_job("Import", import_adjustments, payroll_calendar, path, on_done=report, on_finish=finish_import,
+                       cancelled_message="Import cancelled; no rows were applied.")
+
+    def add_hours(self):
+        if not self.check_idle():
+            return
+        employee_id = self.entry_employee_id.get()
+        hours = float(self.entry_hours.get())
+        date_str = self.entry_date.get()
+
+        try:
+            day = parse_day(date_str)
+            self.payroll_calendar.add_hours(employee_id, day, hours)
+            self.payroll_calendar.commit()
+            print(f"Added {hours} hours for Employee ID {employee_id} on {format_day(day)}.")
+        except ValueError:
+            print(f"Invalid date format. Please use MM/DD/YYYY.")
+        except OSError as e:
+            print(f"Error saving payroll: {e}")
+
+    def remove_hours(self):
+        if not self.check_idle():
+            return
+        employee_id = self.entry_employee_id.get()
+        hours = float(self.entry_hours.get())
+        date_str = self.entry_date.get()
+
+        try:
+            day = parse_day(date_str)
+            self.payroll_calendar.remove_hours(employee_id, day, hours)
+            self.payroll_calendar.commit()
+            print(f"Removed {hours} hours for Employee ID {employee_id} on {format_day(day)}.")
+        except ValueError:
+            print(f"Invalid date format. Please use MM/DD/YYYY.")
+        except OSError as e:
+            print(f"Error saving payroll: {e}")
+
+    def switch_shifts(self):
+        if not self.check_idle():
+            return
+        employee_id_1 = self.entry_employee_id.get()
+        employee_id_2 = self.entry_employee_id_2.get()
+        date_str_1 = self.entry_date.get()
+        date_str_2 = self.entry_date_2.get()
+
+        try:
+            day_1 = parse_day(date_str_1)
+            day_2 = parse_day(date_str_2)
+
+            if self.payroll_calendar.current_period_start <= day_1 <= self.payroll_calendar.current_period_end and \
+               self.payroll_calendar.current_period_start <= day_2 <= self.payroll_calendar.current_period_end:
+                self.payroll_calendar.switch_shifts(employee_id_1, employee_id_2, day_1, day_2)
+                self.payroll_calendar.commit()
+            else:
+                print("Dates are not within the current pay period.")
+
+        except ValueError:
+            print("Invalid date format.")
+        except OSError as e:
+            print(f"Error saving payroll: {e}")
+
+    def lock_period(self):
+        if not self.check_idle():
+            return
+        # Freezes the displayed period and every earlier one; closed periods can no longer be edited
+        period_index = self.displayed_period_index
+        if self.payroll_calendar.is_period_frozen(period_index):
+            print("This pay period is already locked.")
+            return
+        self.start_job("Lock period", lock_periods, self.payroll_calendar, period_index,
+                       on_done=lambda count: print(f"Locked {count} pay periods."), on_finish=self.update_payroll_display)
+
+    def toggle_diagnostics(self):
+        self.diagnostics_visible = not self.diagnostics_visible
+        if self.diagnostics_visible:
+            self.text_diagnostics.grid(row=7, column=0, columnspan=7, padx=10, pady=5, sticky="W")
+            self.refresh_diagnostics()
+        else:
+            self.text_diagnostics.grid_remove()
+
+    def refresh_diagnostics(self):
+        if not self.diagnostics_visible:
+            return
+        self.text_diagnostics.delete("1.0", tk.END)
+        self.text_diagnostics.insert(tk.END, self.metrics.format_table())
+        self.root.after(1000, self.refresh_diagnostics)
+
+    def close(self):
+        # The registry must not close under a running job, so a busy window cancels it and closes once it ends
+        if self.closing:
+            return
+        self.closing = True
+        if self.worker.is_busy():
+            self.worker.cancel_all()
+            self.label_job.config(text="Closing once the current job finishes...")
+        self.finish_close()
+
+    def finish_close(self):
+        if self.worker.is_busy():
+            self.root.after(100, self.finish_close)
+            return
+        self.worker.close()
+        self.metrics.close_log()
+        self.registry.close()
+        self.root.destroy()
+
+    def export_period(self):
+        if not self.check_idle():
+            return
+        # With both date fields filled in, every pay period from Date through Date 2 is exported
+        first_period = last_period = self.displayed_period_index
+        if self.entry_date.get() and self.entry_date_2.get():
+            try:
+                first_period, last_period = sorted(self.payroll_calendar.get_period_index(parse_day(entry.get()))
+                                                   for entry in (self.entry_date, self.entry_date_2))
+            except ValueError:
+                print(f"Invalid date format. Please use MM/DD/YYYY.")
+                return
+        path = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text", "*.txt"), ("CSV", "*.csv")])
+        if not path:
+            return
+        export_format = 'csv' if path.lower().endswith('.csv') else 'text'
+        self.start_job("Export", export_job, self.payroll_calendar, first_period, last_period, path, export_format,
+                       on_done=lambda result: print(f"Exported {last_period - first_period + 1} pay periods to {path}."))
+
+    def update_pay_period(self, direction='next'):
+        if not self.check_idle():
+            return
+        self.payroll_calendar.update_pay_period(direction)
+        self.update_payroll_display()
+
+    @timed('redraw_period', 'rows')
+    def update_payroll_display(self):
+        scroll_pos = self.grid_payroll.yview()[0]
+        self.dirty_rows.clear()
+        self.dirty_days.clear()
+
+        self.displayed_period_index = self.payroll_calendar.get_current_period_index()
+        self.period_matrix = self.payroll_calendar.get_period_matrix(self.displayed_period_index)
+        self.period_days = self.period_matrix.days
+        self.period_weeks = sorted({get_week_start(day) for day in self.period_days})
+        start, end = self.payroll_calendar.current_pay_period()
+
+        self.grid_payroll.set_columns(["ID", "Name"] + [format_day(day, '%a %m/%d') for day in self.period_days] + ["Total"])
+        self.grid_payroll.set_rows(self.payroll_calendar.search_employees(self.search_query.get()),
+                                   self.format_employee_row, self.get_employee_tags)
+        self.grid_payroll.set_footer(self.format_footer_row())
+        self.heatmap_coverage.set_days(self.period_days, self.payroll_calendar.get_daily_coverage(start, end),
+                                       self.payroll_calendar.coverage_index.get_full_headcount())
+
+        self.text_pay_period.delete("1.0", tk.END)
+        closed = " (closed)" if self.payroll_calendar.is_period_frozen(self.displayed_period_index) else ""
+        self.text_pay_period.insert(tk.END, f"{format_day(start)} - {format_day(end)}{closed}")
+
+        self.grid_payroll.yview_moveto(scroll_pos)
+
+    @timed('filter_employees', 'rows')
+    def filter_employees(self):
+        # Only the row list changes; the period matrix, footer and heatmap still cover the whole roster
+        if self.payroll_calendar is None or self.displayed_period_index is None:
+            return
+        self.grid_payroll.set_rows(self.payroll_calendar.search_employees(self.search_query.get()),
+                                   self.format_employee_row, self.get_employee_tags, first_row=0)
+
+    def format_employee_row(self, employee_id):
+        cells = []
+        for preset_hours, added_hours in zip(*self.period_matrix.get_row(employee_id)):
+            if added_hours > 0:
+                cells.append(f"{preset_hours}+{added_hours}" if preset_hours > 0 else f"+{added_hours}")
+            else:
+                cells.append(f"{preset_hours}" if preset_hours > 0 else "")
+        employee_name = self.payroll_calendar.get_employee_name(employee_id)
+        return [employee_id, employee_name] + cells + [round(self.period_matrix.get_employee_total(employee_id), 2)]
+
+    def get_employee_tags(self, employee_id):
+        for week_start in self.period_weeks:
+            if self.payroll_calendar.get_week_overtime(employee_id, week_start)[1] > 0:
+                return ("overtime",)
+        return ()
+
+    def check_overtime(self, change):
+        # The overtime index has already seen this change, so the week total is current
+        payroll_calendar = self.payroll_calendar
+        week_hours = payroll_calendar.get_week_hours(change.employee_id, change.day)
+        hours_before = week_hours - (change.hours_after - change.hours_before)
+        threshold = payroll_calendar.overtime_index.threshold
+        employee_name = payroll_calendar.get_employee_name(change.employee_id)
+        week_str = format_day(get_week_start(change.day))
+        if hours_before <= threshold < week_hours:
+            self.label_overtime.config(text=f"Overtime: {employee_name} ({change.employee_id}) has {round(week_hours, 2)} hours the week of {week_str}")
+        elif week_hours <= threshold < hours_before:
+            self.label_overtime.config(text=f"{employee_name} ({change.employee_id}) is back to {round(week_hours, 2)} hours the week of {week_str}")
+
+    def format_footer_row(self):
+        return ["", "Total"] + [round(hours, 2) for hours in self.period_matrix.day_totals.tolist()] + [round(self.period_matrix.get_total(), 2)]
+
+    def on_payroll_change(self, change):
+        if change.employee_id not in self.payroll_calendar.employees:
+            return
+        self.check_overtime(change)
+        if self.payroll_calendar.get_period_index(change.day) != self.displayed_period_index:
+            return
+        self.period_matrix.set_day(change.employee_id, change.day, change.work_hours, change.added_hours)
+        self.dirty_rows.add(change.employee_id)
+        self.dirty_days.add(change.day)
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.root.after_idle(self.redraw_changes)
+
+    @timed('redraw_change', 'rows')
+    def redraw_changes(self):
+        self.redraw_pending = False
+        if not self.dirty_rows:
+            return
+        for employee_id in self.dirty_rows:
+            self.grid_payroll.refresh_row(employee_id)
+        self.grid_payroll.set_footer(self.format_footer_row())
+        for day in self.dirty_days:
+            self.heatmap_coverage.set_day(day, *self.payroll_calendar.get_day_coverage(day))
+        self.dirty_rows.clear()
+        self.dirty_days.clear()
+
+def load_location(job, registry, location_key):
+    job.report(0, 2, "reading roster and saved edits")
+    payroll_calendar = registry.get(location_key)
+    job.report(1, 2, "recomputing totals")
+    payroll_calendar.rebuild_indexes()
+    return payroll_calendar
+
+def import_adjustments(job, payroll_calendar, path):
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        operations, errors = parse_rows(csv_file, payroll_calendar)
+    if errors:
+        raise ValueError(f"{len(errors)} invalid rows, nothing applied ({errors[0]})")
+    return apply_operations(payroll_calendar, operations, progress=job.report)
+
+def lock_periods(job, payroll_calendar, period_index):
+    return payroll_calendar.freeze_through(period_index, progress=job.report)
+
+def export_job(job, payroll_calendar, first_period, last_period, path, export_format):
+    try:
+        export_periods(payroll_calendar, first_period, last_period, path, export_format, progress=job.report)
+    except JobCancelled:
+        # A partial export is worse than none
+        os.remove(path)
+        raise
+
+def main(location_key=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--location", default=location_key, help="location to open first, e.g. absecon")
+    parser.add_argument("--sqlite", help="store payroll in this SQLite database instead of memory")
+    parser.add_argument("--metrics-log", default=os.path.join(DATA_DIRECTORY, "metrics.log"),
+                        help="JSON-lines log of operation timings; pass an empty value to turn it off")
+    args = parser.parse_args()
+
+    if args.metrics_log:
+        default_metrics.open_log(args.metrics_log)
+
+    registry = LocationRegistry(sqlite_path=args.sqlite)
+    root = tk.Tk()
+    try:
+        app = PayrollApp(root, registry, args.location or registry.keys()[0])
+    except LocationLockedError as e:
+        print(f"Cannot open payroll: {e}")
+        registry.close()
+        root.destroy()
+        return
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import numpy as np
+from WolfPayrollDays import today
+from WolfPayrollMatrix import PeriodMatrix
+
+# <key>.archive holds every ended pay period that is not frozen as fixed-width records, read through mmap:
+#   header       magic, version, pay period length, start day, employee count, period count,
+#                employee table offset, period index offset
+#   employee table  u32 length + JSON list of employee IDs; record employee indexes point into it
+#   record blocks   one per archived period, a record per employee/day with any hours
+#   period index    (block offset, record count, flags) per period from the calendar start
+# Blocks and the index are only ever appended, and the header is rewritten last, so a crash
+# part way through an update leaves the previous archive readable. A new archive is written to
+# a temporary file and renamed over the old one, so read-only processes that still have the old
+# file mapped keep reading it.
+ARCHIVE_MAGIC = b'WPAR'
+ARCHIVE_VERSION = 1
+HEADER = struct.Struct('<4sHHiIIQQ')
+INDEX_ENTRY = struct.Struct('<QII')
+RECORD_DTYPE = np.dtype([('employee', '<u4'), ('day', '<u2'), ('pad', '<u2'), ('preset', '<f8'), ('added', '<f8')])
+# Set on a period's index entry when a late edit changes it; the period is read live until rewritten
+STALE = 1
+# Set, with no records, for a period frozen into the cold store, which is then its only copy
+FROZEN = 2
+
+class PeriodArchive:
+    def __init__(self, path, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.payroll_calendar = None
+        self.archive_file = None
+        self.map = None
+        self.employee_ids = []
+        self.period_count = 0
+        self.index_offset = 0
+        self.lock = threading.Lock()
+
+    def attach(self, payroll_calendar):
+        # Archives every period that ended since the last run, then serves them to get_period_matrix
+        self.payroll_calendar = payroll_calendar
+        try:
+            if not self.read_only:
+                self.update()
+            self.open_map()
+        except Exception as e:
+            print(f"Error opening payroll archive: {e}")
+            self.close_map()
+            return
+        payroll_calendar.archive = self
+        if not self.read_only:
+            payroll_calendar.add_listener(self.on_change)
+
+    def on_change(self, change):
+        period_index = self.payroll_calendar.get_period_index(change.day)
+        with self.lock:
+            if self.map is not None and 0 <= period_index < self.period_count:
+                entry_offset = self.index_offset + period_index * INDEX_ENTRY.size
+                block_offset, record_count, flags = INDEX_ENTRY.unpack_from(self.map, entry_offset)
+                if not flags & STALE:
+                    INDEX_ENTRY.pack_into(self.map, entry_offset, block_offset, record_count, flags | STALE)
+
+    def read_header(self, archive_file):
+        header = archive_file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None
+        magic, version, pay_period_length, start_day, employee_count, period_count, table_offset, index_offset = HEADER.unpack(header)
+        payroll_calendar = self.payroll_calendar
+        if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+            return None
+        if (pay_period_length, start_day) != (payroll_calendar.pay_period_length, payroll_calendar.start_day):
+            return None
+        archive_file.seek(table_offset)
+        table_length, = struct.unpack('<I', archive_file.read(4))
+        employee_ids = json.loads(archive_file.read(table_length))
+        # Record rows are roster positions, so a changed roster means starting a new archive
+        if employee_ids != list(payroll_calendar.employees):
+            return None
+        archive_file.seek(index_offset)
+        index = [list(INDEX_ENTRY.unpack(archive_file.read(INDEX_ENTRY.size))) for _ in range(period_count)]
+        return employee_ids, table_offset, index_offset, index
+
+    def update(self):
+        payroll_calendar = self.payroll_calendar
+        last_ended = payroll_calendar.get_period_index(today()) - 1
+        with self.lock:
+            self.close_map()
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            existing = None
+            if os.path.exists(self.path):
+                with open(self.path, 'rb') as archive_file:
+                    existing = self.read_header(archive_file)
+                # Rewritten periods leave their old blocks behind; start over once those are most of the file
+                if existing is not None:
+                    live_bytes = sum(entry[1] for entry in existing[3]) * RECORD_DTYPE.itemsize
+                    if os.path.getsize(self.path) > 2 * live_bytes + 65536:
+                        existing = None
+            target_path = self.path
+            if existing is None:
+                target_path = self.path + ".tmp"
+                with open(target_path, 'wb') as archive_file:
+                    table = json.dumps(list(payroll_calendar.employees)).encode('utf-8')
+                    archive_file.write(HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, payroll_calendar.pay_period_length,
+                                                   payroll_calendar.start_day, len(payroll_calendar.employees), 0, HEADER.size, 0))
+                    archive_file.write(struct.pack('<I', len(table)) + table)
+                existing = list(payroll_calendar.employees), HEADER.size, 0, []
+            employee_ids, table_offset, index_offset, index = existing
+
+            periods = []
+            frozen = []
+            for period_index in range(max(len(index), last_ended + 1)):
+                if payroll_calendar.is_period_frozen(period_index):
+                    if period_index >= len(index) or not index[period_index][2] & FROZEN:
+                        frozen.append(period_index)
+                elif period_index >= len(index) or index[period_index][2] & STALE:
+                    periods.append(period_index)
+            if not periods and not frozen and target_path == self.path:
+                return 0
+            # The index is positional; every entry added here is filled in below
+            index.extend([0, 0, STALE] for _ in range(len(index), max(periods + frozen + [-1]) + 1))
+            for period_index in frozen:
+                index[period_index] = [0, 0, FROZEN]
+            with open(target_path, 'r+b') as archive_file:
+                archive_file.seek(0, os.SEEK_END)
+                for period_index in periods:
+                    # The map is closed here, so this builds from hot storage
+                    records = get_period_records(payroll_calendar.get_period_matrix(period_index))
+                    index[period_index] = [archive_file.tell(), len(records), 0]
+                    archive_file.write(records.tobytes())
+                index_offset = archive_file.tell()
+                archive_file.write(b''.join(INDEX_ENTRY.pack(*entry) for entry in index))
+                archive_file.flush()
+                os.fsync(archive_file.fileno())
+                archive_file.seek(0)
+                archive_file.write(HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, payroll_calendar.pay_period_length, payroll_calendar.start_day,
+                                               len(employee_ids), len(index), table_offset, index_offset))
+                archive_file.flush()
+                os.fsync(archive_file.fileno())
+            if target_path != self.path:
+                os.replace(target_path, self.path)
+            return len(periods) + len(frozen)
+
+    def open_map(self):
+        with self.lock:
+            if not os.path.exists(self.path):
+                return
+            self.archive_file = open(self.path, 'rb' if self.read_only else 'r+b')
+            existing = self.read_header(self.archive_file)
+            if existing is None:
+                self.archive_file.close()
+                self.archive_file = None
+                return
+            self.employee_ids, table_offset, self.index_offset, index = existing
+            self.period_count = len(index)
+            # Pages are only read in when a period is opened; nothing is loaded up front
+            self.map = mmap.mmap(self.archive_file.fileno(), 0, access=mmap.ACCESS_READ if self.read_only else mmap.ACCESS_WRITE)
+
+    def get_period_matrix(self, period_index):
+        # An O(1) lookup in the period index, then a zero-copy view of that period's records
+        if self.map is None or not 0 <= period_index < self.period_count:
+            return None
+        block_offset, record_count, flags = INDEX_ENTRY.unpack_from(self.map, self.index_offset + period_index * INDEX_ENTRY.size)
+        if flags & (STALE | FROZEN):
+            return None
+        records = np.frombuffer(self.map, RECORD_DTYPE, record_count, block_offset)
+        period_start, period_end = self.payroll_calendar.get_period_range(period_index)
+        preset = np.zeros((len(self.employee_ids), period_end - period_start + 1))
+        added = np.zeros_like(preset)
+        preset[records['employee'], records['day']] = records['preset']
+        added[records['employee'], records['day']] = records['added']
+        del records
+        return PeriodMatrix(period_index, list(range(period_start, period_end + 1)), list(self.employee_ids), preset, added)
+
+    def close_map(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.archive_file is not None:
+            self.archive_file.close()
+            self.archive_file = None
+
+    def close(self):
+        # Rewrites periods edited late and adds any that ended while the calendar was open
+        if self.payroll_calendar is not None and not self.read_only and self.map is not None:
+            self.payroll_calendar.remove_listener(self.on_change)
+            self.payroll_calendar.archive = None
+            try:
+                self.update()
+            except Exception as e:
+                print(f"Error updating payroll archive: {e}")
+        with self.lock:
+            self.close_map()
+
+def get_period_records(period_matrix):
+    rows, columns = np.nonzero((period_matrix.preset > 0) | (period_matrix.added > 0))
+    records = np.zeros(len(rows), dtype=RECORD_DTYPE)
+    records['employee'] = rows
+    records['day'] = columns
+    records['preset'] = period_matrix.preset[rows, columns]
+    records['added'] = period_matrix.added[rows, columns]
+    return records
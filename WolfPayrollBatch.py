@@ -0,0 +1,142 @@
+import argparse
+import csv
+import sys
+import time
+from WolfPayrollCalendar import LocationRegistry
+from WolfPayrollConcurrency import LocationLockedError
+from WolfPayrollDays import parse_day, format_day
+
+# Headless bulk adjustments; never imports tkinter.
+# CSV columns: action,employee_id,date,hours,employee_id_2,date_2
+# action is add, remove or switch; switch uses employee_id_2 and date_2 instead of hours.
+ACTIONS = ('add', 'remove', 'switch')
+
+def parse_rows(csv_file, payroll_calendar, date_format="%m/%d/%Y"):
+    return parse_records(csv.DictReader(csv_file), payroll_calendar, date_format, first_number=2, row_label="line")
+
+def parse_records(records, payroll_calendar, date_format="%m/%d/%Y", first_number=1, row_label="row"):
+    # records are dicts keyed by the CSV column names, from a file or the GUI's batch entry grid
+    operations = []
+    errors = []
+    for line_number, row in enumerate(records, start=first_number):
+        if not any((value or '').strip() for value in row.values()):
+            continue
+        try:
+            action = (row.get('action') or '').strip().lower()
+            if action not in ACTIONS:
+                raise ValueError(f"unknown action '{action}'")
+            employee_id = (row.get('employee_id') or '').strip()
+            if employee_id not in payroll_calendar.employees:
+                raise ValueError(f"unknown employee ID '{employee_id}'")
+            day = parse_date(row.get('date'), payroll_calendar, date_format)
+            if action == 'switch':
+                employee_id_2 = (row.get('employee_id_2') or '').strip()
+                if employee_id_2 not in payroll_calendar.employees:
+                    raise ValueError(f"unknown employee ID '{employee_id_2}'")
+                operations.append((action, employee_id, day, employee_id_2, parse_date(row.get('date_2'), payroll_calendar, date_format)))
+            else:
+                hours = float(row.get('hours') or '')
+                if hours <= 0:
+                    raise ValueError(f"hours must be positive, got {hours}")
+                operations.append((action, employee_id, day, hours))
+        except ValueError as e:
+            errors.append(f"{row_label} {line_number}: {e}")
+    return operations, errors
+
+def parse_date(date_str, payroll_calendar, date_format):
+    day = parse_day((date_str or '').strip(), date_format)
+    if day < payroll_calendar.start_day:
+        raise ValueError(f"{date_str} is before the calendar start date")
+    return day
+
+def apply_operations(payroll_calendar, operations, progress=None):
+    # Rows are checked in order against the running state of the days they touch, the way
+    # PayrollTransaction validates; a removal larger than the hours on the day, a switch onto an
+    # empty shift or an edit in a closed pay period is reported and left out, and every other row
+    # is written in one transaction. progress(done, total) is called every 100 rows while checking
+    # and once more before writing; raising from it cancels the import with nothing applied.
+    summary = {'add': 0, 'remove': 0, 'switch': 0, 'hours_added': 0.0, 'hours_removed': 0.0}
+    employees_touched = set()
+    transaction = payroll_calendar.transaction()
+    rejected = transaction.extend_valid(operations, progress)
+    if progress is not None:
+        progress(len(operations), len(operations))
+    for operation in transaction.operations:
+        action = operation[0]
+        summary[action] += 1
+        if action == 'add':
+            summary['hours_added'] += operation[3]
+        elif action == 'remove':
+            summary['hours_removed'] += operation[3]
+
+    def count_change(change):
+        employees_touched.add(change.employee_id)
+
+    payroll_calendar.add_listener(count_change)
+    try:
+        summary['days_changed'] = transaction.commit()
+    finally:
+        payroll_calendar.remove_listener(count_change)
+    summary['employees_touched'] = len(employees_touched)
+    summary['warnings'] = [f"{describe_operation(operations[position])}: {error}" for position, error in rejected]
+    return summary
+
+def describe_operation(operation):
+    action, employee_id, day = operation[:3]
+    if action == 'switch':
+        return f"switch {employee_id} {format_day(day)} with {operation[3]} {format_day(operation[4])}"
+    return f"{action} {operation[3]} hours for {employee_id} on {format_day(day)}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a CSV of payroll adjustments without opening the GUI.")
+    parser.add_argument("csv_path")
+    parser.add_argument("--location", required=True, help="location key, e.g. absecon")
+    parser.add_argument("--sqlite", help="SQLite database used by the GUI, if any")
+    parser.add_argument("--date-format", default="%m/%d/%Y")
+    parser.add_argument("--dry-run", action="store_true", help="validate only")
+    parser.add_argument("--skip-invalid", action="store_true", help="apply valid rows even if some rows are invalid")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    # A dry run only reads, so it needs no writer lock and can run beside the GUI
+    registry = LocationRegistry(sqlite_path=args.sqlite, read_only=args.dry_run)
+    try:
+        try:
+            payroll_calendar = registry.get(args.location)
+        except LocationLockedError as e:
+            print(f"Cannot apply the batch: {e}", file=sys.stderr)
+            return 1
+        with open(args.csv_path, newline='', encoding='utf-8') as csv_file:
+            operations, errors = parse_rows(csv_file, payroll_calendar, args.date_format)
+
+        for error in errors[:20]:
+            print(error, file=sys.stderr)
+        if len(errors) > 20:
+            print(f"... and {len(errors) - 20} more invalid rows", file=sys.stderr)
+        if errors and not args.skip_invalid:
+            print(f"{len(errors)} invalid rows; nothing applied.")
+            return 1
+        if args.dry_run:
+            # Periods the writer freezes when it opens the location count as closed here too
+            rejected = payroll_calendar.transaction(registry.closed_before.get(args.location)).extend_valid(operations)
+            for position, error in rejected[:20]:
+                print(f"would reject {describe_operation(operations[position])}: {error}", file=sys.stderr)
+            print(f"{len(operations) - len(rejected)} rows would apply, {len(rejected)} would be rejected, "
+                  f"{len(errors)} invalid; nothing applied (dry run).")
+            return 0
+
+        summary = apply_operations(payroll_calendar, operations)
+    finally:
+        registry.close()
+
+    for warning in summary['warnings'][:20]:
+        print(f"rejected: {warning}", file=sys.stderr)
+    print(f"Applied {summary['add'] + summary['remove'] + summary['switch']} of {len(operations)} rows to {payroll_calendar.location} "
+          f"in {time.perf_counter() - started:.2f}s: "
+          f"{summary['add']} add ({summary['hours_added']} hours), {summary['remove']} remove ({summary['hours_removed']} hours), "
+          f"{summary['switch']} switch; {summary['employees_touched']} employees changed, "
+          f"{len(summary['warnings'])} rows rejected, {len(errors)} invalid rows skipped.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,588 @@
+from datetime import timedelta
+from collections import namedtuple
+from contextlib import contextmanager
+import json
+import os
+import threading
+from WolfPayrollArchive import PeriodArchive
+from WolfPayrollCold import ColdStore
+from WolfPayrollConcurrency import WriteSequence, LocationLock, MAX_WRITE_ATTEMPTS
+from WolfPayrollCoverage import CoverageIndex
+from WolfPayrollDays import to_day, today, get_weekday, get_week_start, to_date, parse_iso_day, format_day
+from WolfPayrollEmployee import build_roster
+from WolfPayrollIndex import HoursIndex
+from WolfPayrollJournal import PayrollJournal
+from WolfPayrollMatrix import build_period_matrix
+from WolfPayrollMetrics import default_metrics, timed
+from WolfPayrollOvertime import OvertimeIndex
+from WolfPayrollSearch import EmployeeSearchIndex
+from WolfPayrollStorage import MemoryStorage, SQLiteStorage
+from WolfPayrollTransaction import PayrollTransaction, TransactionError
+
+LOCATIONS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locations")
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payroll_data")
+# Ended pay periods are frozen this many days after their last day unless a location sets freeze_after_days
+FREEZE_AFTER_DAYS = 7
+
+# hours_before/hours_after are the day's totals; work_hours and added_hours are its two parts after the change
+PayrollChange = namedtuple('PayrollChange', ['employee_id', 'day', 'hours_before', 'hours_after', 'work_hours', 'added_hours'])
+
+class PayrollCalendar:
+    # Days are integer ordinals (see WolfPayrollDays); start_date may be given as a date or datetime
+    def __init__(self, start_date, pay_period_length=14, storage=None, location='default', roster=(), metrics=None):
+        self.metrics = metrics if metrics is not None else default_metrics
+        # Writers plan under the locks of the employees they touch only. Applying a day to storage and
+        # the indexes is a short step under index_lock, so an index built lazily on another thread
+        # never sees a stored change its event has not reached yet. Snapshot readers take no lock.
+        self.write_sequence = WriteSequence()
+        self.index_lock = threading.RLock()
+        # A roster with repeated IDs is rejected here instead of one employee silently replacing another
+        self.initialize_employees(roster)
+        try:
+            self.start_day = to_day(start_date)
+            self.pay_period_length = pay_period_length
+            self.location = location
+            self.storage = storage if storage is not None else MemoryStorage()
+            self.storage.open(location, self.start_day, pay_period_length)
+            self.listeners = []
+            # Set by PeriodArchive.attach; ended periods are then read from the archive file
+            self.archive = None
+            # Set by PayrollJournal.attach; commit() then waits until the caller's edits are fsynced
+            self.journal = None
+            # Set by attach_cold_store; days from the start up to hot_start_day are frozen and read from it
+            self.cold_store = None
+            self.hot_start_day = self.start_day
+            self.hours_index = HoursIndex(self)
+            self.add_listener(self.hours_index.on_change)
+            self.overtime_index = OvertimeIndex(self)
+            self.add_listener(self.overtime_index.on_change)
+            self.coverage_index = CoverageIndex(self)
+            self.add_listener(self.coverage_index.on_change)
+            self.current_period_start, self.current_period_end = self.calculate_current_pay_period()
+            self.storage.save_employees(self.employees)
+        except Exception as e:
+            print(f"Error initializing PayrollCalendar: {e}")
+
+    def calculate_current_pay_period(self):
+        try:
+            # Whole days only, so period boundaries fall on midnight
+            return self.get_period_range(self.get_period_index(today()))
+        except Exception as e:
+            print(f"Error calculating current pay period: {e}")
+
+    def update_pay_period(self, direction='next'):
+        try:
+            if direction == 'next':
+                if today() > self.current_period_end:
+                    self.current_period_start, self.current_period_end = self.calculate_current_pay_period()
+            elif direction == 'previous':
+                self.current_period_start -= self.pay_period_length
+                self.current_period_end -= self.pay_period_length
+        except Exception as e:
+            print(f"Error updating pay period: {e}")
+
+    def current_pay_period(self):
+        try:
+            return self.current_period_start, self.current_period_end
+        except Exception as e:
+            print(f"Error getting current pay period: {e}")
+    
+    def get_period_index(self, day):
+        return (day - self.start_day) // self.pay_period_length
+
+    def get_current_period_index(self):
+        return self.get_period_index(self.current_period_start)
+
+    def get_period_matrix(self, period_index):
+        # Frozen periods only exist in the cold store; the archive holds ended periods that are still hot
+        if self.is_period_frozen(period_index):
+            return self.cold_store.get_period_matrix(self, period_index)
+        archive = self.archive
+        if archive is not None:
+            period_matrix = archive.get_period_matrix(period_index)
+            if period_matrix is not None:
+                return period_matrix
+        return self.write_sequence.read(build_period_matrix, self, period_index)
+
+    def get_period_totals(self, period_index):
+        # Preset and added hours per employee in roster order; frozen periods answer from their summary
+        if self.is_period_frozen(period_index):
+            return self.cold_store.get_period_totals(self, period_index)
+        period_matrix = self.get_period_matrix(period_index)
+        return period_matrix.preset.sum(axis=1), period_matrix.added.sum(axis=1)
+
+    def get_period_range(self, period_index):
+        period_start = self.start_day + period_index * self.pay_period_length
+        return period_start, period_start + self.pay_period_length - 1
+
+    def get_period_payroll(self, period_index):
+        return self.storage.get_period_added(period_index)
+
+    def get_period_overrides(self, period_index):
+        return self.storage.get_period_overrides(period_index)
+
+    def get_added_hours(self, employee_id, day):
+        if self.start_day <= day < self.hot_start_day:
+            return self.cold_store.get_day(self, employee_id, day)[1]
+        return self.storage.get_added_hours(employee_id, day)
+
+    def is_frozen(self, day):
+        return self.start_day <= day < self.hot_start_day
+
+    def is_period_frozen(self, period_index):
+        return self.is_frozen(self.get_period_range(period_index)[0])
+
+    def attach_cold_store(self, cold_store):
+        cold_store.load(self)
+        self.cold_store = cold_store
+        frozen_count = cold_store.get_frozen_count()
+        self.hot_start_day = self.start_day + frozen_count * self.pay_period_length
+        if frozen_count:
+            # Clears anything left behind by a freeze interrupted between the cold write and the drop
+            self.storage.drop_periods(0, frozen_count - 1)
+
+    @timed('freeze_periods')
+    def freeze_through(self, period_index, progress=None):
+        # Moves every period up to period_index out of hot storage into the cold store. Frozen
+        # periods are read from their compressed detail and can no longer be edited.
+        if self.cold_store is None:
+            raise ValueError("This location has no cold store to freeze pay periods into.")
+        if self.cold_store.read_only:
+            raise ValueError("Pay periods can only be frozen by the process that has this location open for writing.")
+        period_end = self.get_period_range(period_index)[1]
+        if period_end >= today():
+            raise ValueError(f"The pay period ending {format_day(period_end)} has not ended yet.")
+        first_period = self.get_period_index(self.hot_start_day)
+        for index in range(first_period, period_index + 1):
+            with self.locked_employees(self.employees):
+                self.write_sequence.begin()
+                try:
+                    with self.index_lock:
+                        self.cold_store.freeze(self, build_period_matrix(self, index))
+                        self.hot_start_day = self.get_period_range(index)[1] + 1
+                        self.storage.drop_periods(index, index)
+                finally:
+                    self.write_sequence.end()
+            if progress is not None:
+                progress(index - first_period + 1, period_index - first_period + 1, f"Froze {format_day(self.hot_start_day - 1)}")
+        return max(0, period_index - first_period + 1)
+
+    def iter_changed_days(self):
+        # (employee_id, day, work_hours, added_hours) for every day that differs from the weekly rule;
+        # frozen days come from the cold store's changed-day lists without expanding their detail
+        if self.cold_store is not None:
+            yield from self.cold_store.iter_changed_days(self)
+        for employee_id, day in self.storage.iter_changed_days():
+            yield employee_id, day, self.get_work_hours(employee_id, day), self.get_added_hours(employee_id, day)
+
+    def iter_day_changes(self):
+        # Each changed day as a change from its weekly rule to what it holds now; the totals
+        # indexes build by replaying these through the path their change events take
+        for employee_id, day, work_hours, added_hours in self.iter_changed_days():
+            yield PayrollChange(employee_id, day, self.get_scheduled_hours(employee_id, day), work_hours + added_hours, work_hours, added_hours)
+
+    @timed('set_added_hours')
+    def set_added_hours(self, employee_id, day, hours):
+        self.write_days({(employee_id, day): (None, hours)})
+
+    @contextmanager
+    def locked_employees(self, employee_ids):
+        # Always taken in ID order, so writers touching overlapping employees cannot deadlock
+        locks = [self.get_employee_lock(employee_id) for employee_id in sorted(set(employee_ids))]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def get_employee_lock(self, employee_id):
+        lock = self.employee_locks.get(employee_id)
+        if lock is None:
+            lock = self.employee_locks.setdefault(employee_id, threading.RLock())
+        return lock
+
+    def get_versions(self, employee_ids):
+        return {employee_id: self.employees[employee_id].version for employee_id in employee_ids if employee_id in self.employees}
+
+    def write_days(self, days, versions=None):
+        # days maps (employee_id, day) to (work_hours, added_hours); None leaves that value alone.
+        # Given the versions the caller planned from, this is a compare-and-swap: nothing is written
+        # and False is returned if any of those employees has been written since.
+        employee_ids = {employee_id for employee_id, day in days} | set(versions or ())
+        with self.locked_employees(employee_ids):
+            if versions is not None and self.get_versions(versions) != versions:
+                return False
+            for employee_id, day in days:
+                if self.is_frozen(day):
+                    raise ValueError(f"{format_day(day)} is in a closed pay period.")
+            self.write_sequence.begin()
+            written = []
+            try:
+                for (employee_id, day), (work_hours, added_hours) in days.items():
+                    written.append((employee_id, day, self.get_work_hours(employee_id, day), self.get_added_hours(employee_id, day)))
+                    self._store_day(employee_id, day, work_hours, added_hours)
+            except Exception:
+                # Put back every day already written, so a storage failure leaves no half-applied edit
+                for employee_id, day, work_hours, added_hours in reversed(written):
+                    self._store_day(employee_id, day, work_hours, added_hours)
+                raise
+            finally:
+                for employee_id in employee_ids:
+                    if employee_id in self.employees:
+                        self.employees[employee_id].version += 1
+                self.write_sequence.end()
+        return True
+
+    def update_days(self, employee_ids, plan):
+        # Optimistic read-modify-write: plan() reads without locks and returns the days to write,
+        # which land only if none of employee_ids changed in between; otherwise plan() runs again
+        for attempt in range(MAX_WRITE_ATTEMPTS):
+            versions = self.get_versions(employee_ids)
+            days = plan()
+            if self.write_days(days, versions):
+                return days
+        with self.locked_employees(employee_ids):
+            days = plan()
+            self.write_days(days)
+            return days
+
+    def _store_day(self, employee_id, day, work_hours, added_hours):
+        with self.index_lock:
+            before = self.get_work_hours(employee_id, day), self.get_added_hours(employee_id, day)
+            if work_hours is not None:
+                self.storage.set_override(employee_id, day, work_hours if work_hours != self.get_scheduled_hours(employee_id, day) else None)
+            if added_hours is not None:
+                self.storage.set_added_hours(employee_id, day, added_hours if added_hours > 0 else None)
+            self._notify(employee_id, day, before)
+
+    def commit(self):
+        # An edit is only confirmed once it is durable: the journal's group commit holding this
+        # thread's records has been fsynced, or the SQLite backend has committed
+        self.storage.commit()
+        journal = self.journal
+        if journal is not None:
+            journal.wait_flushed()
+
+    def close(self):
+        self.storage.close()
+        if self.cold_store is not None:
+            self.cold_store.close()
+
+    def get_day_hours(self, employee_id, day):
+        return self.get_work_hours(employee_id, day) + self.get_added_hours(employee_id, day)
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _notify(self, employee_id, day, before):
+        # Moving hours between the preset shift and added hours leaves the total alone but still has
+        # to reach the journal, the archive and the grid, so any change to either part is an event
+        work_hours, added_hours = self.get_work_hours(employee_id, day), self.get_added_hours(employee_id, day)
+        if (work_hours, added_hours) == before:
+            return
+        change = PayrollChange(employee_id, day, sum(before), work_hours + added_hours, work_hours, added_hours)
+        self.metrics.touch()
+        for callback in list(self.listeners):
+            try:
+                callback(change)
+            except Exception as e:
+                print(f"Error notifying payroll listener: {e}")
+
+    @timed('add_hours')
+    def add_hours(self, employee_id, day, hours):
+        try:
+            self.update_days([employee_id], lambda: {(employee_id, day): (None, self.get_added_hours(employee_id, day) + hours)})
+        except Exception as e:
+            print(f"Error adding hours: {e}")
+    
+    @timed('add_extra_hours')
+    def add_extra_hours(self, employee_id, day, hours):
+        try:
+            self.add_hours(employee_id, day, hours)
+        except Exception as e:
+            print(f"Error adding extra hours: {e}")
+        
+    @timed('remove_hours')
+    def remove_hours(self, employee_id, day, hours):
+        try:
+            if employee_id in self.employees:
+                messages = []
+
+                def plan():
+                    del messages[:]
+                    added_hours = self.get_added_hours(employee_id, day)
+                    remaining_hours = 0
+
+                    if added_hours >= hours:
+                        new_added_hours = added_hours - hours
+                    else:
+                        remaining_hours = hours - added_hours
+                        new_added_hours = 0
+                    new_work_hours = None
+
+                    if remaining_hours > 0:
+                        if day >= self.start_day:
+                            current_hours = self.get_work_hours(employee_id, day)
+                            if current_hours >= remaining_hours:
+                                new_work_hours = current_hours - remaining_hours
+                            else:
+                                messages.append(f"Cannot remove {hours} hours. Only {current_hours + added_hours} hours available for {format_day(day)}.")
+                                return {}
+                        else:
+                            messages.append(f"No preset hours found for {format_day(day)}.")
+                            return {}
+                    return {(employee_id, day): (new_work_hours, new_added_hours)}
+
+                self.update_days([employee_id], plan)
+                for message in messages:
+                    print(message)
+        except Exception as e:
+            print(f"Error removing hours: {e}")
+
+    @timed('switch_shifts')
+    def switch_shifts(self, employee_id_1, employee_id_2, day_1, day_2):
+        try:
+            if employee_id_1 in self.employees and employee_id_2 in self.employees:
+                # Both employees' days change together, so this goes through a transaction
+                transaction = self.transaction()
+                transaction.switch_shifts(employee_id_1, employee_id_2, day_1, day_2)
+                try:
+                    transaction.commit()
+                except TransactionError as e:
+                    for error in e.errors:
+                        print(error)
+                    print("Shifts not switched.")
+                    return
+                hours_1, hours_2 = transaction.switched[-1]
+                print(f"Transferred {hours_1} hours from {employee_id_1} to {employee_id_2} and {hours_2} hours from {employee_id_2} to {employee_id_1}.")
+        except Exception as e:
+            print(f"Error switching shifts: {e}")
+
+    def transaction(self, closed_before=None):
+        # Group add/remove/switch calls so they are validated together and applied all or nothing.
+        # closed_before also rejects days before it as closed, for dry runs of a writer that will freeze them.
+        return PayrollTransaction(self, closed_before)
+
+    def initialize_employees(self, roster=()):
+        # Only the weekday rule is kept per employee; daily hours are resolved on demand
+        self.employees = build_roster(roster)
+        self.employee_locks = {employee_id: threading.RLock() for employee_id in self.employees}
+        self.search_index = EmployeeSearchIndex(self.employees)
+
+    def search_employees(self, query):
+        return self.search_index.search(query)
+
+    def get_employee_name(self, employee_id):
+        employee = self.employees.get(employee_id)
+        return employee.name if employee is not None else 'Unknown'
+
+    def get_employee_work_schedule(self, employee_id, start_day=None, end_day=None):
+        if start_day is None:
+            start_day, end_day = self.current_pay_period()
+        return {day: self.get_work_hours(employee_id, day) for day in self.get_period_days(start_day, end_day)}
+
+    def get_period_days(self, start_day=None, end_day=None):
+        if start_day is None:
+            start_day, end_day = self.current_pay_period()
+        return list(range(start_day, end_day + 1))
+
+    def is_workday(self, employee_id, day):
+        return self.get_work_hours(employee_id, day) > 0.0
+
+    def get_scheduled_hours(self, employee_id, day):
+        if employee_id not in self.employees or day < self.start_day:
+            return 0.0
+        return self.employees[employee_id].work_schedule[get_weekday(day)]
+
+    def get_work_hours(self, employee_id, day):
+        if self.start_day <= day < self.hot_start_day:
+            return self.cold_store.get_day(self, employee_id, day)[0]
+        override = self.storage.get_override(employee_id, day)
+        if override is not None:
+            return override
+        return self.get_scheduled_hours(employee_id, day)
+
+    @timed('set_work_hours')
+    def set_work_hours(self, employee_id, day, hours):
+        self.write_days({(employee_id, day): (hours, None)})
+
+    def get_scheduled_total(self, employee_id, start_day, end_day):
+        start_day = max(start_day, self.start_day)
+        if employee_id not in self.employees or end_day < start_day:
+            return 0.0
+        work_schedule = self.employees[employee_id].work_schedule
+        full_weeks, extra_days = divmod(end_day - start_day + 1, 7)
+        total_hours = full_weeks * sum(work_schedule)
+        for offset in range(extra_days):
+            total_hours += work_schedule[(get_weekday(start_day) + offset) % 7]
+        return total_hours
+
+    def get_total_hours(self, start_day, end_day, employee_ids=None):
+        return self.write_sequence.read(self._get_total_hours, start_day, end_day, employee_ids)
+
+    def _get_total_hours(self, start_day, end_day, employee_ids=None):
+        # Weekly rules are summed in closed form and everything else comes from the prefix-sum index
+        if employee_ids is None:
+            employee_ids = self.employees
+        first_offset = max(0, start_day - self.start_day)
+        last_offset = end_day - self.start_day
+        totals = {employee_id: self.get_scheduled_total(employee_id, start_day, end_day) + self.hours_index.get_delta_total(employee_id, first_offset, last_offset)
+                  for employee_id in employee_ids}
+        if start_day < self.start_day:
+            # Only added hours can exist before the calendar start, and the index does not cover them
+            early_totals = self.storage.sum_added_hours(start_day, min(end_day, self.start_day - 1))
+            for employee_id, hours in early_totals.items():
+                if employee_id in totals:
+                    totals[employee_id] += hours
+        return totals
+
+    def query_hours(self, employee_ids, start_day, end_day, grouping='total'):
+        results = {employee_id: [] for employee_id in employee_ids}
+        for bucket_start, bucket_end in self.iter_range_buckets(start_day, end_day, grouping):
+            totals = self.get_total_hours(bucket_start, bucket_end, employee_ids)
+            for employee_id in employee_ids:
+                results[employee_id].append((bucket_start, bucket_end, totals[employee_id]))
+        return results
+
+    def iter_range_buckets(self, start_day, end_day, grouping='total'):
+        bucket_start = start_day
+        while bucket_start <= end_day:
+            if grouping == 'day':
+                bucket_end = bucket_start
+            elif grouping == 'week':
+                bucket_end = get_week_start(bucket_start) + 6
+            elif grouping == 'pay_period':
+                bucket_end = self.get_period_range(self.get_period_index(bucket_start))[1]
+            elif grouping == 'month':
+                next_month = (to_date(bucket_start).replace(day=1) + timedelta(days=32)).replace(day=1)
+                bucket_end = next_month.toordinal() - 1
+            elif grouping == 'total':
+                bucket_end = end_day
+            else:
+                raise ValueError(f"Unknown grouping '{grouping}'. Use day, week, pay_period, month or total.")
+            bucket_end = min(bucket_end, end_day)
+            yield bucket_start, bucket_end
+            bucket_start = bucket_end + 1
+
+    def rebuild_indexes(self):
+        # The totals indexes normally build on first use; this builds them all up front
+        self.hours_index.build()
+        self.overtime_index.build()
+        self.coverage_index.build()
+
+    def get_week_hours(self, employee_id, day):
+        return self.overtime_index.get_week_total(employee_id, day)
+
+    def get_week_overtime(self, employee_id, day):
+        # (regular, overtime) hours for the ISO week containing day
+        return self.overtime_index.split_hours(self.get_week_hours(employee_id, day))
+
+    def get_overtime(self, start_day, end_day, employee_ids=None):
+        # Every week touching the range where an employee went over the threshold, as (week_start, regular, overtime)
+        if employee_ids is None:
+            employee_ids = self.employees
+        week_starts = []
+        week_start = get_week_start(start_day)
+        while week_start <= end_day:
+            week_starts.append(week_start)
+            week_start += 7
+        overtime = {}
+        for employee_id in employee_ids:
+            for week_start in week_starts:
+                regular_hours, overtime_hours = self.get_week_overtime(employee_id, week_start)
+                if overtime_hours > 0:
+                    overtime.setdefault(employee_id, []).append((week_start, regular_hours, overtime_hours))
+        return overtime
+
+    def get_day_coverage(self, day):
+        # (headcount, hours) scheduled on day across the roster
+        return self.coverage_index.get_day_coverage(day)
+
+    def get_daily_coverage(self, start_day, end_day):
+        return {day: self.get_day_coverage(day) for day in self.get_period_days(start_day, end_day)}
+
+    def get_daily_totals(self, start_day, end_day):
+        return {day: hours for day, (headcount, hours) in self.get_daily_coverage(start_day, end_day).items()}
+
+class LocationRegistry:
+    # Rosters live in locations/<key>.json and are only read when a location is first opened
+    def __init__(self, locations_directory=LOCATIONS_DIRECTORY, data_directory=DATA_DIRECTORY, sqlite_path=None, journal=True, read_only=False):
+        self.locations_directory = locations_directory
+        self.data_directory = data_directory
+        self.sqlite_path = sqlite_path
+        self.journal = journal
+        # Read-only registries replay the journal but never append to or compact it, so several
+        # processes can load the same location while the GUI keeps writing. Only one writable
+        # registry at a time may open a location; see LocationLock.
+        self.read_only = read_only
+        self.calendars = {}
+        self.journals = {}
+        self.archives = {}
+        self.locks = {}
+        # First day still open for edits once a writer has frozen what freeze_after_days closes
+        self.closed_before = {}
+
+    def keys(self):
+        return sorted(name[:-len('.json')] for name in os.listdir(self.locations_directory) if name.endswith('.json'))
+
+    def get(self, key):
+        if key not in self.calendars:
+            self.calendars[key] = self.load(key)
+        return self.calendars[key]
+
+    def load(self, key):
+        if not self.read_only and key not in self.locks:
+            location_lock = LocationLock(os.path.join(self.data_directory, f"{key}.lock"))
+            location_lock.acquire()
+            self.locks[key] = location_lock
+        with open(os.path.join(self.locations_directory, f"{key}.json"), encoding='utf-8') as location_file:
+            location = json.load(location_file)
+        storage = SQLiteStorage(self.sqlite_path) if self.sqlite_path else None
+        payroll_calendar = PayrollCalendar(parse_iso_day(location['start_date']), location.get('pay_period_length', 14),
+                                           storage=storage, location=location['name'], roster=location['employees'])
+        if self.journal:
+            payroll_calendar.attach_cold_store(ColdStore(os.path.join(self.data_directory, f"{key}.cold"), read_only=self.read_only))
+        # A SQLite backend is durable on its own; the journal only backs the in-memory default
+        if storage is None and self.journal:
+            payroll_journal = PayrollJournal(self.data_directory, key)
+            if self.read_only:
+                payroll_journal.replay(payroll_calendar)
+            else:
+                payroll_journal.attach(payroll_calendar)
+                self.journals[key] = payroll_journal
+        # freeze_after_days: null leaves freezing to a manager locking periods by hand. Only a writer,
+        # which holds the location lock, freezes, so no other process can still be editing those days.
+        # A read-only registry still notes where the writer will close, for dry runs to check against.
+        freeze_after_days = location.get('freeze_after_days', FREEZE_AFTER_DAYS)
+        if self.journal and freeze_after_days is not None:
+            last_period = payroll_calendar.get_period_index(today() - freeze_after_days) - 1
+            if last_period >= 0:
+                self.closed_before[key] = payroll_calendar.get_period_range(last_period)[1] + 1
+                if not self.read_only and not payroll_calendar.is_period_frozen(last_period):
+                    payroll_calendar.freeze_through(last_period)
+        if self.journal:
+            period_archive = PeriodArchive(os.path.join(self.data_directory, f"{key}.archive"), read_only=self.read_only)
+            period_archive.attach(payroll_calendar)
+            self.archives[key] = period_archive
+        return payroll_calendar
+
+    def close(self):
+        for period_archive in self.archives.values():
+            period_archive.close()
+        for payroll_journal in self.journals.values():
+            payroll_journal.close()
+        for payroll_calendar in self.calendars.values():
+            payroll_calendar.close()
+        for location_lock in self.locks.values():
+            location_lock.release()
+        self.journals = {}
+        self.archives = {}
+        self.calendars = {}
+        self.locks = {}
+        self.closed_before = {}
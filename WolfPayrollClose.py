@@ -0,0 +1,173 @@
+import argparse
+import csv
+import math
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+import numpy as np
+from WolfPayrollCalendar import LocationRegistry, LOCATIONS_DIRECTORY, DATA_DIRECTORY
+from WolfPayrollDays import format_day, get_week_start, today
+
+# One pay period of one location as it comes back from a worker. Per-employee totals are float64
+# arrays in roster order packed into bytes, so a period costs a few hundred bytes to send.
+PeriodSummary = namedtuple('PeriodSummary', ['location_key', 'period_index', 'start_day', 'end_day', 'preset', 'added', 'overtime'])
+
+CSV_HEADER = ['record', 'location', 'period_start', 'period_end', 'employee_id', 'name', 'preset_hours', 'added_hours', 'total_hours', 'overtime_hours']
+
+# Set in each worker process by init_worker; locations are loaded on first use and kept for later chunks
+worker_registry = None
+
+def init_worker(locations_directory, data_directory, sqlite_path):
+    global worker_registry
+    worker_registry = LocationRegistry(locations_directory, data_directory, sqlite_path, read_only=True)
+
+def summarize_periods(location_key, first_period, last_period):
+    payroll_calendar = worker_registry.get(location_key)
+    return [summarize_period(payroll_calendar, location_key, period_index) for period_index in range(first_period, last_period + 1)]
+
+def summarize_period(payroll_calendar, location_key, period_index):
+    start_day, end_day = payroll_calendar.get_period_range(period_index)
+    # Frozen periods come straight from their summaries without expanding the detail
+    preset, added = payroll_calendar.get_period_totals(period_index)
+    # A week's overtime belongs to the period holding its Monday, so no week is counted twice
+    week_starts = range(get_week_start(start_day + 6), end_day + 1, 7)
+    overtime = np.array([sum(payroll_calendar.get_week_overtime(employee_id, week_start)[1] for week_start in week_starts)
+                         for employee_id in payroll_calendar.employees], dtype=float)
+    return PeriodSummary(location_key, period_index, start_day, end_day, np.asarray(preset, dtype=float).tobytes(),
+                         np.asarray(added, dtype=float).tobytes(), overtime.tobytes())
+
+def get_year_periods(payroll_calendar, year):
+    # Pay periods that end during the year and have already ended; the rest would count weekly-rule hours nobody has worked yet
+    first_period = max(0, payroll_calendar.get_period_index(date(year, 1, 1).toordinal()))
+    last_period = min(payroll_calendar.get_period_index(date(year + 1, 1, 1).toordinal()),
+                      payroll_calendar.get_period_index(today())) - 1
+    return first_period, last_period
+
+def split_periods(first_period, last_period, chunk_size):
+    for chunk_start in range(first_period, last_period + 1, chunk_size):
+        yield chunk_start, min(last_period, chunk_start + chunk_size - 1)
+
+class LocationReport:
+    def __init__(self, payroll_calendar):
+        self.payroll_calendar = payroll_calendar
+        self.employee_ids = list(payroll_calendar.employees)
+        self.preset = np.zeros(len(self.employee_ids))
+        self.added = np.zeros(len(self.employee_ids))
+        self.overtime = np.zeros(len(self.employee_ids))
+        self.periods = {}
+
+    def add(self, summary):
+        preset = np.frombuffer(summary.preset)
+        added = np.frombuffer(summary.added)
+        overtime = np.frombuffer(summary.overtime)
+        self.preset += preset
+        self.added += added
+        self.overtime += overtime
+        self.periods[summary.period_index] = (summary.start_day, summary.end_day, preset.sum(), added.sum(), overtime.sum())
+
+def close_year(registry, location_keys, year, workers=None, chunk_size=None, progress=None):
+    # Spreads (location, run of periods) chunks over a process pool and merges the summaries as they finish
+    reports = {}
+    tasks = []
+    for location_key in location_keys:
+        reports[location_key] = LocationReport(registry.get(location_key))
+        first_period, last_period = get_year_periods(reports[location_key].payroll_calendar, year)
+        tasks.append((location_key, first_period, last_period))
+    workers = workers or os.cpu_count() or 1
+    period_count = sum(max(0, last_period - first_period + 1) for location_key, first_period, last_period in tasks)
+    if chunk_size is None:
+        # A few chunks per worker keeps the pool busy when locations differ in size
+        chunk_size = max(1, math.ceil(period_count / (workers * 4)))
+    chunks = [(location_key,) + chunk for location_key, first_period, last_period in tasks
+              for chunk in split_periods(first_period, last_period, chunk_size)]
+
+    initargs = (registry.locations_directory, registry.data_directory, registry.sqlite_path)
+    done = 0
+    if workers == 1:
+        init_worker(*initargs)
+        results = (summarize_periods(*chunk) for chunk in chunks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs)
+        futures = [executor.submit(summarize_periods, *chunk) for chunk in chunks]
+        results = (future.result() for future in as_completed(futures))
+    try:
+        for summaries in results:
+            for summary in summaries:
+                reports[summary.location_key].add(summary)
+            done += len(summaries)
+            if progress is not None:
+                progress(done, period_count)
+    finally:
+        if workers != 1:
+            executor.shutdown(cancel_futures=True)
+    return reports
+
+def iter_report_rows(reports):
+    for location_key, report in reports.items():
+        location = report.payroll_calendar.location
+        for period_index, (start_day, end_day, preset, added, overtime) in sorted(report.periods.items()):
+            yield ['period', location, format_day(start_day), format_day(end_day), '', '',
+                   round(preset, 2), round(added, 2), round(preset + added, 2), round(overtime, 2)]
+        if not report.periods:
+            continue
+        start_str = format_day(min(period[0] for period in report.periods.values()))
+        end_str = format_day(max(period[1] for period in report.periods.values()))
+        for row, employee_id in enumerate(report.employee_ids):
+            preset, added, overtime = float(report.preset[row]), float(report.added[row]), float(report.overtime[row])
+            yield ['employee', location, start_str, end_str, employee_id, report.payroll_calendar.get_employee_name(employee_id),
+                   round(preset, 2), round(added, 2), round(preset + added, 2), round(overtime, 2)]
+        preset, added, overtime = float(report.preset.sum()), float(report.added.sum()), float(report.overtime.sum())
+        yield ['location', location, start_str, end_str, '', '', round(preset, 2), round(added, 2), round(preset + added, 2), round(overtime, 2)]
+
+def iter_report_text(reports, year):
+    yield f"Year-End Payroll Report: {year}\n\n"
+    for row in iter_report_rows(reports):
+        record, location, start_str, end_str, employee_id, name, preset, added, total, overtime = row
+        if record == 'period':
+            yield f"{location} Pay Period: {start_str} - {end_str}, Total Hours: {total}, Overtime Hours: {overtime}\n"
+        elif record == 'employee':
+            yield f"    Employee ID: {employee_id}, Name: {name}, Preset Hours: {preset}, Added Hours: {added}, Total Hours: {total}, Overtime Hours: {overtime}\n"
+        else:
+            yield f"{location} {start_str} - {end_str}: Total Hours: {total}, Overtime Hours: {overtime}\n\n"
+
+def write_report(reports, year, path, report_format='text'):
+    with open(path, 'w', newline='', encoding='utf-8') as report_file:
+        if report_format == 'csv':
+            writer = csv.writer(report_file)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(iter_report_rows(reports))
+        else:
+            report_file.writelines(iter_report_text(reports, year))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Close a payroll year: summarize every pay period ending in it for each location.")
+    parser.add_argument("path")
+    parser.add_argument("--year", type=int, default=date.today().year)
+    parser.add_argument("--locations", help="comma-separated location keys; defaults to every location")
+    parser.add_argument("--sqlite", help="SQLite database used by the GUI, if any")
+    parser.add_argument("--format", choices=("text", "csv"), default="text")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes; 1 runs everything in this process")
+    parser.add_argument("--chunk-size", type=int, help="pay periods per task")
+    args = parser.parse_args(argv)
+
+    # The parent only needs rosters and period boundaries; the workers replay the edits
+    registry = LocationRegistry(LOCATIONS_DIRECTORY, DATA_DIRECTORY, args.sqlite, journal=False, read_only=True)
+    try:
+        location_keys = args.locations.split(",") if args.locations else registry.keys()
+        started = time.perf_counter()
+        reports = close_year(registry, location_keys, args.year, args.workers, args.chunk_size)
+        write_report(reports, args.year, args.path, args.format)
+        period_count = sum(len(report.periods) for report in reports.values())
+        if date(args.year + 1, 1, 1).toordinal() > today():
+            print(f"{args.year} is not over yet; only pay periods that have ended are included.")
+        print(f"Closed {args.year}: {period_count} pay periods across {len(reports)} locations in "
+              f"{time.perf_counter() - started:.2f}s with {args.workers} workers; report written to {args.path}.")
+    finally:
+        registry.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
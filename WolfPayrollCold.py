@@ -0,0 +1,282 @@
+import json
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+import numpy as np
+from WolfPayrollArchive import RECORD_DTYPE, get_period_records
+from WolfPayrollMatrix import PeriodMatrix
+
+# <key>.cold holds the pay periods that have been frozen, in order from the calendar start:
+#   header   magic, version, pay period length, start day
+#   entries  period index, table length, employee count, changed-day count, compressed length, then
+#            the roster table (JSON employee IDs and weekly rules; left out when it is the same as the
+#            entry before), preset and added totals per employee (float64), the days that differ
+#            from the weekly rule in the archive's fixed-width layout, and every day with hours in
+#            that layout, compressed with zlib
+# Entries are only appended and each is synced before the period leaves hot storage, so a torn
+# final entry only means that period is still hot. Only the entry positions and roster tables are
+# read at load; totals, changed days and detail are read from the file when asked for.
+COLD_MAGIC = b'WPCS'
+COLD_VERSION = 2
+COLD_HEADER = struct.Struct('<4sHHi')
+COLD_ENTRY = struct.Struct('<iIIII')
+
+class FrozenTable:
+    __slots__ = ('employee_ids', 'work_schedules')
+
+    def __init__(self, employee_ids, work_schedules):
+        self.employee_ids = employee_ids
+        self.work_schedules = work_schedules
+
+    def matches(self, employee_ids, work_schedules):
+        return self.employee_ids == employee_ids and np.array_equal(self.work_schedules, work_schedules)
+
+    def to_bytes(self):
+        return json.dumps({'employee_ids': self.employee_ids, 'work_schedules': self.work_schedules.tolist()}).encode('utf-8')
+
+class FrozenPeriod:
+    __slots__ = ('period_index', 'table', 'offset', 'change_count', 'detail_length')
+
+    def __init__(self, period_index, table, offset, change_count, detail_length):
+        self.period_index = period_index
+        self.table = table
+        self.offset = offset
+        self.change_count = change_count
+        self.detail_length = detail_length
+
+    def get_changes_offset(self):
+        return self.offset + 16 * len(self.table.employee_ids)
+
+    def get_detail_offset(self):
+        return self.get_changes_offset() + self.change_count * RECORD_DTYPE.itemsize
+
+    def get_length(self):
+        return self.get_detail_offset() + self.detail_length - self.offset
+
+class ColdStore:
+    # Frozen periods of one location. Nothing but their positions stays in memory; the last few
+    # periods read are kept expanded for day lookups. Freezing is left to the process holding
+    # the location's writer lock; everyone else opens the store read-only.
+    def __init__(self, path, read_only=False, cache_size=4):
+        self.path = path
+        self.read_only = read_only
+        self.cache_size = cache_size
+        self.periods = {}
+        self.cache = OrderedDict()
+        self.cold_file = None
+        self.end_offset = 0
+        self.last_table = None
+        self.lock = threading.Lock()
+
+    def load(self, payroll_calendar):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as cold_file:
+            magic, version, pay_period_length, start_day = COLD_HEADER.unpack(cold_file.read(COLD_HEADER.size))
+            if magic != COLD_MAGIC or version != COLD_VERSION:
+                raise ValueError(f"{self.path} is not a version {COLD_VERSION} cold store")
+            # Unlike the archive this is the only copy of those periods, so it is never started over
+            if (pay_period_length, start_day) != (payroll_calendar.pay_period_length, payroll_calendar.start_day):
+                raise ValueError(f"{self.path} was frozen with a different start date or pay period length")
+            file_size = os.fstat(cold_file.fileno()).st_size
+            self.end_offset = cold_file.tell()
+            while True:
+                entry = cold_file.read(COLD_ENTRY.size)
+                if len(entry) < COLD_ENTRY.size:
+                    break
+                period_index, table_length, employee_count, change_count, detail_length = COLD_ENTRY.unpack(entry)
+                table = self.last_table
+                if table_length:
+                    table_bytes = cold_file.read(table_length)
+                    if len(table_bytes) < table_length:
+                        break
+                    table = read_table(table_bytes)
+                if table is None or len(table.employee_ids) != employee_count:
+                    break
+                frozen_period = FrozenPeriod(period_index, table, cold_file.tell(), change_count, detail_length)
+                if frozen_period.offset + frozen_period.get_length() > file_size:
+                    break
+                self.periods[period_index] = frozen_period
+                self.last_table = table
+                self.end_offset = cold_file.seek(frozen_period.offset + frozen_period.get_length())
+        self.open_reader()
+
+    def open_reader(self):
+        # Unbuffered, so a read never comes from a buffer filled before this process appended to the file
+        self.cold_file = open(self.path, 'rb', buffering=0)
+
+    def read(self, offset, length):
+        with self.lock:
+            self.cold_file.seek(offset)
+            return self.cold_file.read(length)
+
+    def get_frozen_count(self):
+        # Frozen periods are always a run from period 0
+        frozen_count = 0
+        while frozen_count in self.periods:
+            frozen_count += 1
+        return frozen_count
+
+    def freeze(self, payroll_calendar, period_matrix):
+        if self.read_only:
+            raise ValueError("Pay periods can only be frozen by the process that has this location open for writing.")
+        employee_ids = list(period_matrix.employee_ids)
+        work_schedules = get_work_schedules(payroll_calendar, employee_ids)
+        table = self.last_table
+        table_bytes = b''
+        if table is None or not table.matches(employee_ids, work_schedules):
+            table = FrozenTable(employee_ids, work_schedules)
+            table_bytes = table.to_bytes()
+        changes = get_changed_records(period_matrix, work_schedules)
+        detail = zlib.compress(get_period_records(period_matrix).tobytes())
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self.lock:
+            with open(self.path, 'r+b' if self.end_offset else 'wb') as cold_file:
+                if not self.end_offset:
+                    cold_file.write(COLD_HEADER.pack(COLD_MAGIC, COLD_VERSION, payroll_calendar.pay_period_length, payroll_calendar.start_day))
+                else:
+                    # Drops a torn entry left by a crash, which load() stopped at
+                    cold_file.seek(self.end_offset)
+                    cold_file.truncate()
+                cold_file.write(COLD_ENTRY.pack(period_matrix.period_index, len(table_bytes), len(employee_ids), len(changes), len(detail)) + table_bytes)
+                frozen_period = FrozenPeriod(period_matrix.period_index, table, cold_file.tell(), len(changes), len(detail))
+                cold_file.write(period_matrix.preset.sum(axis=1).tobytes() + period_matrix.added.sum(axis=1).tobytes() + changes.tobytes() + detail)
+                cold_file.flush()
+                os.fsync(cold_file.fileno())
+                self.end_offset = cold_file.tell()
+            if self.cold_file is None:
+                self.open_reader()
+        self.last_table = table
+        self.periods[frozen_period.period_index] = frozen_period
+
+    def get_period_matrix(self, payroll_calendar, period_index):
+        # A copy, so the caller can treat it like any other period matrix
+        period_matrix = self.expand(payroll_calendar, period_index)
+        return PeriodMatrix(period_index, list(period_matrix.days), list(period_matrix.employee_ids),
+                            period_matrix.preset.copy(), period_matrix.added.copy())
+
+    def expand(self, payroll_calendar, period_index):
+        employees = payroll_calendar.employees
+        with self.lock:
+            cached = self.cache.get(period_index)
+            if cached is not None and cached[0] is employees:
+                self.cache.move_to_end(period_index)
+                return cached[1]
+        frozen_period = self.periods[period_index]
+        period_start, period_end = payroll_calendar.get_period_range(period_index)
+        days = np.arange(period_start, period_end + 1)
+        employee_ids = list(employees)
+        # Anyone hired after the period was frozen shows their weekly rule, as they would have live
+        preset = get_work_schedules(payroll_calendar, employee_ids)[:, (days - 1) % 7]
+        added = np.zeros_like(preset)
+        rows = get_roster_rows(frozen_period.table.employee_ids, employee_ids)
+        preset[rows[rows >= 0]] = 0.0
+        records = np.frombuffer(zlib.decompress(self.read(frozen_period.get_detail_offset(), frozen_period.detail_length)), RECORD_DTYPE)
+        record_rows = rows[records['employee']]
+        kept = record_rows >= 0
+        preset[record_rows[kept], records['day'][kept]] = records['preset'][kept]
+        added[record_rows[kept], records['day'][kept]] = records['added'][kept]
+        period_matrix = PeriodMatrix(period_index, days.tolist(), employee_ids, preset, added)
+        with self.lock:
+            self.cache[period_index] = (employees, period_matrix)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return period_matrix
+
+    def get_day(self, payroll_calendar, employee_id, day):
+        # (work_hours, added_hours)
+        period_matrix = self.expand(payroll_calendar, payroll_calendar.get_period_index(day))
+        row = period_matrix.row_index.get(employee_id)
+        if row is None:
+            return 0.0, 0.0
+        column = period_matrix.get_column(day)
+        return float(period_matrix.preset[row, column]), float(period_matrix.added[row, column])
+
+    def get_period_totals(self, payroll_calendar, period_index):
+        # Preset and added totals in roster order, straight from the summary without expanding the detail
+        frozen_period = self.periods[period_index]
+        frozen_ids = frozen_period.table.employee_ids
+        totals = np.frombuffer(self.read(frozen_period.offset, 16 * len(frozen_ids)), np.float64)
+        frozen_rows = {employee_id: row for row, employee_id in enumerate(frozen_ids)}
+        period_start, period_end = payroll_calendar.get_period_range(period_index)
+        preset, added = [], []
+        for employee_id in payroll_calendar.employees:
+            row = frozen_rows.get(employee_id)
+            if row is None:
+                preset.append(payroll_calendar.get_scheduled_total(employee_id, period_start, period_end))
+                added.append(0.0)
+            else:
+                preset.append(totals[row])
+                added.append(totals[len(frozen_ids) + row])
+        return np.array(preset, dtype=float), np.array(added, dtype=float)
+
+    def iter_changed_days(self, payroll_calendar):
+        # Frozen days that differ from the weekly rule, as (employee_id, day, work_hours, added_hours).
+        # They come from each entry's changed-day list; only a period frozen under weekly rules the
+        # roster no longer has is expanded and compared with today's rules instead.
+        employee_ids = list(payroll_calendar.employees)
+        work_schedules = get_work_schedules(payroll_calendar, employee_ids)
+        rules_changed = {}
+        for period_index in sorted(self.periods):
+            frozen_period = self.periods[period_index]
+            table = frozen_period.table
+            if id(table) not in rules_changed:
+                rows = get_roster_rows(table.employee_ids, employee_ids)
+                kept = rows >= 0
+                rules_changed[id(table)] = (kept.tolist(), not np.array_equal(table.work_schedules[kept], work_schedules[rows[kept]]))
+            kept, changed = rules_changed[id(table)]
+            if changed:
+                yield from self.iter_expanded_changes(payroll_calendar, period_index)
+                continue
+            if not frozen_period.change_count:
+                continue
+            changes = np.frombuffer(self.read(frozen_period.get_changes_offset(), frozen_period.change_count * RECORD_DTYPE.itemsize), RECORD_DTYPE)
+            period_start = payroll_calendar.get_period_range(period_index)[0]
+            for row, column, preset, added in zip(changes['employee'].tolist(), changes['day'].tolist(),
+                                                  changes['preset'].tolist(), changes['added'].tolist()):
+                # Anyone no longer on the roster reads as no hours, as get_day reports them
+                if kept[row]:
+                    yield table.employee_ids[row], period_start + column, preset, added
+
+    def iter_expanded_changes(self, payroll_calendar, period_index):
+        period_matrix = self.expand(payroll_calendar, period_index)
+        days = np.array(period_matrix.days)
+        schedule = get_work_schedules(payroll_calendar, period_matrix.employee_ids)[:, (days - 1) % 7]
+        rows, columns = np.nonzero((period_matrix.preset != schedule) | (period_matrix.added > 0))
+        for row, column in zip(rows.tolist(), columns.tolist()):
+            yield (period_matrix.employee_ids[row], period_matrix.days[column],
+                   float(period_matrix.preset[row, column]), float(period_matrix.added[row, column]))
+
+    def close(self):
+        with self.lock:
+            if self.cold_file is not None:
+                self.cold_file.close()
+                self.cold_file = None
+
+def read_table(table_bytes):
+    table = json.loads(table_bytes)
+    return FrozenTable(table['employee_ids'], np.array(table['work_schedules'], dtype=float).reshape(len(table['employee_ids']), 7))
+
+def get_work_schedules(payroll_calendar, employee_ids):
+    employees = payroll_calendar.employees
+    return np.array([employees[employee_id].work_schedule for employee_id in employee_ids], dtype=float).reshape(len(employee_ids), 7)
+
+def get_roster_rows(frozen_ids, employee_ids):
+    # For each frozen row, that employee's row in the roster now, or -1 if they have left it
+    row_index = {employee_id: row for row, employee_id in enumerate(employee_ids)}
+    return np.array([row_index.get(employee_id, -1) for employee_id in frozen_ids], dtype=int)
+
+def get_changed_records(period_matrix, work_schedules):
+    # Days whose preset hours differ from the weekly rule or that have added hours; this is all the
+    # totals indexes need from a frozen period
+    days = np.array(period_matrix.days)
+    schedule = work_schedules[:, (days - 1) % 7]
+    rows, columns = np.nonzero((period_matrix.preset != schedule) | (period_matrix.added > 0))
+    records = np.zeros(len(rows), dtype=RECORD_DTYPE)
+    records['employee'] = rows
+    records['day'] = columns
+    records['preset'] = period_matrix.preset[rows, columns]
+    records['added'] = period_matrix.added[rows, columns]
+    return records
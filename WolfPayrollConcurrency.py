@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# Optimistic writes that keep losing their compare-and-swap fall back to planning under the locks
+MAX_WRITE_ATTEMPTS = 8
+# Snapshot reads that keep overlapping writers hold new writes back until one read gets through
+MAX_READ_ATTEMPTS = 8
+
+class WriteSequence:
+    # A seqlock for many concurrent writers. `started` and `finished` count write sections; a
+    # reader that saw every started section finished before it began, and no new one started
+    # by the time it was done, read a state no writer was halfway through. Readers take no lock.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = 0
+        self.finished = 0
+        self.writes_allowed = threading.Event()
+        self.writes_allowed.set()
+        self.held_back_by = 0
+        self.local = threading.local()
+
+    def begin(self):
+        self.writes_allowed.wait()
+        with self.lock:
+            self.started += 1
+        self.local.depth = getattr(self.local, 'depth', 0) + 1
+
+    def end(self):
+        self.local.depth -= 1
+        with self.lock:
+            self.finished += 1
+
+    def read(self, function, *args):
+        # A listener reading from inside a write section already sees that write's own state
+        if getattr(self.local, 'depth', 0):
+            return function(*args)
+        attempts = 0
+        try:
+            while True:
+                started = self.started
+                if self.finished == started:
+                    try:
+                        result = function(*args)
+                        if self.started == started:
+                            return result
+                    except RuntimeError as e:
+                        # A dictionary changed size under the reader; the retry sees it settled
+                        if "changed size" not in str(e):
+                            raise
+                attempts += 1
+                if attempts == MAX_READ_ATTEMPTS:
+                    self.hold_writes()
+                time.sleep(0)
+        finally:
+            if attempts >= MAX_READ_ATTEMPTS:
+                self.release_writes()
+
+    def hold_writes(self):
+        with self.lock:
+            self.held_back_by += 1
+            self.writes_allowed.clear()
+
+    def release_writes(self):
+        with self.lock:
+            self.held_back_by -= 1
+            if not self.held_back_by:
+                self.writes_allowed.set()
+
+class LocationLockedError(RuntimeError):
+    pass
+
+class LocationLock:
+    # Held by the one process that has a location open for writing: its journal, cold store and
+    # archive are only ever written by that process. The operating system releases the lock when
+    # the process exits, so a crash never leaves a stale lock behind.
+    def __init__(self, path):
+        self.path = path
+        self.lock_file = None
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        lock_file = open(self.path, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            raise LocationLockedError(f"{self.path} is held by another writer; close the other payroll window, server or batch run, "
+                                      f"or open this location read-only")
+        self.lock_file = lock_file
+
+    def release(self):
+        if self.lock_file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                self.lock_file.seek(0)
+                msvcrt.locking(self.lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError as e:
+            print(f"Error releasing location lock: {e}")
+        self.lock_file.close()
+        self.lock_file = None
@@ -0,0 +1,37 @@
+from WolfPayrollDays import get_weekday
+from WolfPayrollIndex import ChangeIndex
+
+class CoverageIndex(ChangeIndex):
+    # Headcount and hours scheduled on each day: a baseline per weekday from the weekly rules,
+    # plus per-day deltas kept current from change events. A day counts towards headcount
+    # while an employee has any hours on it, so an edit only moves the counters of its own day.
+    def __init__(self, payroll_calendar):
+        super().__init__(payroll_calendar)
+        self.weekday_coverage = None
+        self.day_deltas = {}
+
+    def reset(self):
+        employees = self.payroll_calendar.employees.values()
+        self.weekday_coverage = [(sum(1 for employee in employees if employee.work_schedule[weekday] > 0),
+                                  sum(employee.work_schedule[weekday] for employee in employees))
+                                 for weekday in range(7)]
+        self.day_deltas = {}
+
+    def apply_change(self, change):
+        if change.employee_id in self.payroll_calendar.employees:
+            self.add_delta(change.day, (change.hours_after > 0) - (change.hours_before > 0), change.hours_after - change.hours_before)
+
+    def add_delta(self, day, headcount_delta, hours_delta):
+        headcount, hours = self.day_deltas.get(day, (0, 0.0))
+        self.day_deltas[day] = (headcount + headcount_delta, hours + hours_delta)
+
+    def get_day_coverage(self, day):
+        self.build_once()
+        headcount, hours = self.weekday_coverage[get_weekday(day)] if day >= self.payroll_calendar.start_day else (0, 0.0)
+        headcount_delta, hours_delta = self.day_deltas.get(day, (0, 0.0))
+        return headcount + headcount_delta, hours + hours_delta
+
+    def get_full_headcount(self):
+        # Largest headcount the weekly rules schedule on any weekday, used to scale the heatmap
+        self.build_once()
+        return max(headcount for headcount, hours in self.weekday_coverage)
@@ -0,0 +1,34 @@
+from datetime import date, datetime
+from functools import lru_cache
+
+# Days are proleptic Gregorian ordinals (date.toordinal()): plain ints that hash cheaply and
+# make period and week arithmetic simple subtraction. Dates are only parsed and formatted
+# at the edges (GUI entries, exports, the journal and SQLite), through the helpers below.
+def to_day(value):
+    if isinstance(value, int):
+        return value
+    return value.toordinal()
+
+def today():
+    return date.today().toordinal()
+
+def get_weekday(day):
+    # Ordinal 1 (0001-01-01) is a Monday, matching date.weekday()
+    return (day - 1) % 7
+
+def get_week_start(day):
+    return day - get_weekday(day)
+
+def to_date(day):
+    return date.fromordinal(day)
+
+def parse_day(date_str, date_format="%m/%d/%Y"):
+    return datetime.strptime(date_str, date_format).toordinal()
+
+def parse_iso_day(date_str):
+    return date.fromisoformat(date_str).toordinal()
+
+@lru_cache(maxsize=1024)
+def format_day(day, date_format="%m/%d/%Y"):
+    # The grid and exports format the same few dozen days over and over
+    return date.fromordinal(day).strftime(date_format)
@@ -0,0 +1,28 @@
+from array import array
+
+class Employee:
+    # One compact record per employee: the weekly rule is seven packed doubles (Monday first).
+    # Per-day exceptions to the rule stay in the calendar's storage, which only holds days that differ.
+    # version counts committed writes to this employee's days, for compare-and-swap in the calendar.
+    __slots__ = ('employee_id', 'name', 'work_schedule', 'version')
+
+    def __init__(self, employee_id, name, work_schedule):
+        self.employee_id = employee_id
+        self.name = name
+        self.work_schedule = array('d', work_schedule)
+        if len(self.work_schedule) != 7:
+            raise ValueError(f"Employee ID {employee_id} needs 7 weekday hours, got {len(self.work_schedule)}")
+        self.version = 0
+
+    def __repr__(self):
+        return f"Employee({self.employee_id!r}, {self.name!r}, {list(self.work_schedule)!r})"
+
+def build_roster(records):
+    # Roster records are {"id", "name", "work_schedule"}; a repeated ID would silently hide an employee
+    employees = {}
+    for record in records:
+        employee_id = record['id']
+        if employee_id in employees:
+            raise ValueError(f"Duplicate employee ID {employee_id}: {employees[employee_id].name} and {record['name']}")
+        employees[employee_id] = Employee(employee_id, record['name'], record['work_schedule'])
+    return employees
@@ -0,0 +1,52 @@
+import tkinter as tk
+
+# (record key, heading, entry width); keys match the batch CSV columns
+BATCH_COLUMNS = (('employee_id', "Employee ID", 10), ('date', "Date", 11), ('hours', "Hours", 6),
+                 ('employee_id_2', "Employee ID 2", 10), ('date_2', "Date 2", 11))
+ACTIONS = ("add", "remove", "switch")
+
+class BatchEntryGrid:
+    # Rows of add/remove/switch corrections that are submitted together as one batch
+    def __init__(self, master, rows=7, on_submit=None):
+        self.frame = tk.Frame(master)
+        self.rows = []
+        tk.Label(self.frame, text="Action").grid(row=0, column=0, padx=2)
+        for column, (key, heading, width) in enumerate(BATCH_COLUMNS, start=1):
+            tk.Label(self.frame, text=heading).grid(row=0, column=column, padx=2)
+
+        self.button_add_row = tk.Button(self.frame, text="Add Row", command=self.add_row)
+        self.button_add_row.grid(row=1, column=len(BATCH_COLUMNS) + 1, padx=10)
+        self.button_clear = tk.Button(self.frame, text="Clear", command=self.clear)
+        self.button_clear.grid(row=2, column=len(BATCH_COLUMNS) + 1, padx=10)
+        self.button_submit = tk.Button(self.frame, text="Submit Batch", command=on_submit)
+        self.button_submit.grid(row=3, column=len(BATCH_COLUMNS) + 1, padx=10)
+
+        for _ in range(rows):
+            self.add_row()
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def grid_remove(self):
+        self.frame.grid_remove()
+
+    def add_row(self):
+        row = len(self.rows) + 1
+        action = tk.StringVar(self.frame, value="")
+        tk.OptionMenu(self.frame, action, "", *ACTIONS).grid(row=row, column=0, padx=2, pady=1)
+        entries = {}
+        for column, (key, heading, width) in enumerate(BATCH_COLUMNS, start=1):
+            entries[key] = tk.Entry(self.frame, width=width)
+            entries[key].grid(row=row, column=column, padx=2, pady=1)
+        self.rows.append((action, entries))
+
+    def get_records(self):
+        # One record per row, blank rows included so error messages can refer to row numbers
+        return [dict({'action': action.get()}, **{key: entry.get().strip() for key, entry in entries.items()})
+                for action, entries in self.rows]
+
+    def clear(self):
+        for action, entries in self.rows:
+            action.set("")
+            for entry in entries.values():
+                entry.delete(0, tk.END)
@@ -0,0 +1,85 @@
+import argparse
+import csv
+import sys
+from WolfPayrollCalendar import LocationRegistry
+from WolfPayrollDays import parse_day, format_day
+
+# Reports are generators that build one pay period's hours matrix at a time, so exports
+# covering many periods are written to disk as they are produced.
+CSV_HEADER = ['record', 'period_start', 'period_end', 'employee_id', 'name', 'date', 'preset_hours', 'added_hours', 'total_hours']
+
+def iter_employee_days(period_matrix, employee_id):
+    for day, preset_hours, added_hours in zip(period_matrix.days, *period_matrix.get_row(employee_id)):
+        if preset_hours > 0 or added_hours > 0:
+            yield day, preset_hours, added_hours
+
+def iter_period_text(payroll_calendar, period_index):
+    period_matrix = payroll_calendar.get_period_matrix(period_index)
+    yield f"Pay Period: {format_day(period_matrix.days[0])} - {format_day(period_matrix.days[-1])}\n\n"
+
+    for employee_id in period_matrix.employee_ids:
+        yield f"Employee ID: {employee_id}, Name: {payroll_calendar.get_employee_name(employee_id)}\n"
+        for day, preset_hours, added_hours in iter_employee_days(period_matrix, employee_id):
+            if preset_hours > 0:
+                yield f"    Date: {format_day(day)}, Preset Hours: {preset_hours}\n"
+            if added_hours > 0:
+                yield f"    Date: {format_day(day)}, Added Hours: {added_hours}\n"
+        yield f"    Total Hours Worked: {period_matrix.get_employee_total(employee_id)}\n\n"
+
+    yield "Hours Worked Summary:\n"
+    for employee_id in period_matrix.employee_ids:
+        yield f"{payroll_calendar.get_employee_name(employee_id)}, {period_matrix.get_employee_total(employee_id)}\n"
+    yield "\n"
+
+def iter_period_rows(payroll_calendar, period_index):
+    period_matrix = payroll_calendar.get_period_matrix(period_index)
+    start_str, end_str = format_day(period_matrix.days[0]), format_day(period_matrix.days[-1])
+
+    for employee_id in period_matrix.employee_ids:
+        employee_name = payroll_calendar.get_employee_name(employee_id)
+        for day, preset_hours, added_hours in iter_employee_days(period_matrix, employee_id):
+            yield ['detail', start_str, end_str, employee_id, employee_name, format_day(day), preset_hours, added_hours, '']
+        yield ['total', start_str, end_str, employee_id, employee_name, '', '', '', period_matrix.get_employee_total(employee_id)]
+
+def export_periods(payroll_calendar, first_period, last_period, path, export_format='text', progress=None):
+    # progress(done, total) is called before each period; it may raise to stop the export
+    with open(path, 'w', newline='', encoding='utf-8') as export_file:
+        if export_format == 'csv':
+            writer = csv.writer(export_file)
+            writer.writerow(CSV_HEADER)
+        for period_index in range(first_period, last_period + 1):
+            if progress is not None:
+                progress(period_index - first_period, last_period - first_period + 1)
+            if export_format == 'csv':
+                writer.writerows(iter_period_rows(payroll_calendar, period_index))
+            else:
+                export_file.writelines(iter_period_text(payroll_calendar, period_index))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export pay periods to CSV or text.")
+    parser.add_argument("path")
+    parser.add_argument("--location", required=True, help="location key, e.g. absecon")
+    parser.add_argument("--sqlite", help="SQLite database used by the GUI, if any")
+    parser.add_argument("--format", choices=("text", "csv"), default="text")
+    parser.add_argument("--start", help="MM/DD/YYYY; export from the pay period containing this date")
+    parser.add_argument("--end", help="MM/DD/YYYY; export through the pay period containing this date")
+    args = parser.parse_args(argv)
+
+    # Read-only, so an export never touches the journal, archive or cold store and can run beside the GUI
+    registry = LocationRegistry(sqlite_path=args.sqlite, read_only=True)
+    try:
+        payroll_calendar = registry.get(args.location)
+        last_period = payroll_calendar.get_current_period_index()
+        if args.end:
+            last_period = payroll_calendar.get_period_index(parse_day(args.end))
+        first_period = last_period
+        if args.start:
+            first_period = max(0, payroll_calendar.get_period_index(parse_day(args.start)))
+        export_periods(payroll_calendar, first_period, last_period, args.path, args.format)
+        print(f"Exported {last_period - first_period + 1} pay periods for {payroll_calendar.location} to {args.path}.")
+    finally:
+        registry.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import tkinter as tk
+from tkinter import ttk
+
+class VirtualGrid:
+    # Only `visible_rows` Treeview items ever exist; scrolling re-fills them from row_source
+    def __init__(self, master, visible_rows=20, column_width=70, metrics=None):
+        self.visible_rows = visible_rows
+        self.metrics = metrics
+        self.column_width = column_width
+        self.row_keys = []
+        self.row_positions = {}
+        self.row_source = lambda key: ()
+        self.row_tags = lambda key: ()
+        self.first_row = 0
+
+        self.frame = tk.Frame(master)
+        self.tree = ttk.Treeview(self.frame, show="headings", height=visible_rows, selectmode="browse")
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.footer = ttk.Treeview(self.frame, show="", height=1, selectmode="none")
+        self.footer.grid(row=1, column=0, sticky="ew")
+        self.frame.columnconfigure(0, weight=1)
+
+        for widget in (self.tree, self.footer):
+            widget.bind("<MouseWheel>", self.on_mousewheel)
+            widget.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+            widget.bind("<Button-5>", lambda event: self.scroll_rows(3))
+
+        self.items = [self.tree.insert("", tk.END, values=()) for _ in range(visible_rows)]
+        self.footer_item = self.footer.insert("", tk.END, values=())
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def set_columns(self, headings):
+        columns = [f"c{index}" for index in range(len(headings))]
+        for widget in (self.tree, self.footer):
+            widget.configure(columns=columns)
+            for column, heading in zip(columns, headings):
+                widget.column(column, width=self.column_width, minwidth=40, stretch=False, anchor=tk.CENTER)
+                if widget is self.tree:
+                    widget.heading(column, text=heading)
+
+    def set_rows(self, row_keys, row_source, row_tags=None, first_row=None):
+        self.row_keys = list(row_keys)
+        self.row_positions = {key: position for position, key in enumerate(self.row_keys)}
+        self.row_source = row_source
+        self.row_tags = row_tags or (lambda key: ())
+        if first_row is not None:
+            self.first_row = first_row
+        self.first_row = min(self.first_row, self.max_first_row())
+        self.fill_rows()
+
+    def tag_configure(self, tag, **options):
+        self.tree.tag_configure(tag, **options)
+
+    def set_footer(self, values):
+        self.footer.item(self.footer_item, values=values)
+
+    def refresh_row(self, key):
+        position = self.row_positions.get(key)
+        if position is not None and self.first_row <= position < self.first_row + self.visible_rows:
+            self.tree.item(self.items[position - self.first_row], values=self.row_source(key), tags=self.row_tags(key))
+            if self.metrics is not None:
+                self.metrics.touch('rows')
+
+    def fill_rows(self):
+        for slot, item in enumerate(self.items):
+            position = self.first_row + slot
+            if position < len(self.row_keys):
+                key = self.row_keys[position]
+                self.tree.item(item, values=self.row_source(key), tags=self.row_tags(key))
+            else:
+                self.tree.item(item, values=(), tags=())
+        if self.metrics is not None:
+            self.metrics.touch('rows', min(self.visible_rows, len(self.row_keys) - self.first_row))
+        self.scrollbar.set(*self.yview())
+
+    def max_first_row(self):
+        return max(0, len(self.row_keys) - self.visible_rows)
+
+    def scroll_rows(self, count):
+        first_row = max(0, min(self.first_row + count, self.max_first_row()))
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self.fill_rows()
+
+    def on_mousewheel(self, event):
+        self.scroll_rows(-1 if event.delta > 0 else 1)
+        return "break"
+
+    def yview(self, *args):
+        # Same protocol as Text/Treeview yview so a Scrollbar can drive it directly
+        if not args:
+            if not self.row_keys:
+                return 0.0, 1.0
+            total = len(self.row_keys)
+            return self.first_row / total, min(1.0, (self.first_row + self.visible_rows) / total)
+        if args[0] == "moveto":
+            self.yview_moveto(float(args[1]))
+        elif args[0] == "scroll":
+            count = int(args[1])
+            self.scroll_rows(count * self.visible_rows if args[2] == "pages" else count)
+
+    def yview_moveto(self, fraction):
+        first_row = int(round(fraction * len(self.row_keys)))
+        self.first_row = max(0, min(first_row, self.max_first_row()))
+        self.fill_rows()
@@ -0,0 +1,52 @@
+import tkinter as tk
+
+LOW_COLOR = (248, 215, 218)
+HIGH_COLOR = (195, 230, 203)
+
+class CoverageHeatmap:
+    # One cell per date for headcount and one for hours, lined up under the grid's date columns.
+    # Cells are drawn once per period; an edit only re-colours and re-labels its own date.
+    def __init__(self, master, column_width=70, row_height=20, label_columns=2):
+        self.column_width = column_width
+        self.row_height = row_height
+        self.label_columns = label_columns
+        self.full_headcount = 0
+        self.cells = {}
+        self.canvas = tk.Canvas(master, height=row_height * 2, highlightthickness=0)
+
+    def grid(self, **kwargs):
+        self.canvas.grid(**kwargs)
+
+    def set_days(self, days, coverage, full_headcount):
+        self.canvas.delete("all")
+        self.cells = {}
+        self.full_headcount = full_headcount
+        label_width = self.column_width * self.label_columns
+        self.canvas.configure(width=label_width + self.column_width * len(days))
+        for row, label in enumerate(("Staff", "Hours")):
+            self.canvas.create_text(label_width - 5, row * self.row_height + self.row_height // 2, text=label, anchor=tk.E)
+
+        for column, day in enumerate(days):
+            x = label_width + column * self.column_width
+            cells = []
+            for row in range(2):
+                y = row * self.row_height
+                rectangle = self.canvas.create_rectangle(x, y, x + self.column_width, y + self.row_height, outline="white")
+                text = self.canvas.create_text(x + self.column_width // 2, y + self.row_height // 2)
+                cells.append((rectangle, text))
+            self.cells[day] = cells
+            self.set_day(day, *coverage[day])
+
+    def set_day(self, day, headcount, hours):
+        cells = self.cells.get(day)
+        if cells is None:
+            return
+        color = self.get_color(headcount)
+        for (rectangle, text), value in zip(cells, (headcount, round(hours, 2))):
+            self.canvas.itemconfigure(rectangle, fill=color)
+            self.canvas.itemconfigure(text, text=str(value))
+
+    def get_color(self, headcount):
+        ratio = min(1.0, headcount / self.full_headcount) if self.full_headcount else 0.0
+        red, green, blue = (round(low + (high - low) * ratio) for low, high in zip(LOW_COLOR, HIGH_COLOR))
+        return f"#{red:02x}{green:02x}{blue:02x}"
@@ -0,0 +1,92 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+class ChangeIndex:
+    # Shared by the totals indexes, which all hold hours beyond the weekly rules. Nothing is kept
+    # until the first query; build() then replays every changed day as a change from its rule
+    # through apply_change, the same path later change events take, so the two cannot drift apart.
+    def __init__(self, payroll_calendar):
+        self.payroll_calendar = payroll_calendar
+        self.built = False
+
+    def on_change(self, change):
+        if self.built:
+            self.apply_change(change)
+
+    def build(self):
+        # Change events are applied under index_lock, so none can land part way through the replay
+        with self.payroll_calendar.index_lock:
+            self.reset()
+            for change in self.payroll_calendar.iter_day_changes():
+                self.apply_change(change)
+            self.built = True
+
+    def build_once(self):
+        if not self.built:
+            with self.payroll_calendar.index_lock:
+                if not self.built:
+                    self.build()
+
+    def reset(self):
+        raise NotImplementedError
+
+    def apply_change(self, change):
+        raise NotImplementedError
+
+class HoursIndex(ChangeIndex):
+    # Per employee, hours beyond the weekly rule on each day that has any, as sorted day offsets
+    # from the calendar start with the deltas beside them and a running (prefix) sum over those
+    # days, so any date range costs two binary searches and days on the rule take no space.
+    # Change events only touch the daily delta and mark where the prefix needs repairing; the
+    # repair runs on the next query and only covers changed days from the earliest edit onwards.
+    def __init__(self, payroll_calendar):
+        super().__init__(payroll_calendar)
+        self.reset()
+
+    def reset(self):
+        self.deltas = {}
+        self.offsets = {}
+        self.prefix = {}
+        self.dirty_from = {}
+
+    def apply_change(self, change):
+        offset = change.day - self.payroll_calendar.start_day
+        if offset >= 0:
+            self.add_delta(change.employee_id, offset, change.hours_after - change.hours_before)
+
+    def add_delta(self, employee_id, offset, hours_delta):
+        offsets = self.offsets.setdefault(employee_id, array('l'))
+        deltas = self.deltas.setdefault(employee_id, array('d'))
+        position = bisect_left(offsets, offset)
+        if position == len(offsets) or offsets[position] != offset:
+            offsets.insert(position, offset)
+            deltas.insert(position, 0.0)
+        deltas[position] += hours_delta
+        self.dirty_from[employee_id] = min(self.dirty_from.get(employee_id, position), position)
+
+    def get_delta_total(self, employee_id, first_offset, last_offset):
+        # Queries repair the prefix in place, so they share the lock change events are applied under
+        with self.payroll_calendar.index_lock:
+            self.build_once()
+            if employee_id not in self.deltas:
+                return 0.0
+            prefix = self.get_prefix(employee_id)
+            offsets = self.offsets[employee_id]
+            first = bisect_left(offsets, first_offset)
+            last = bisect_right(offsets, last_offset)
+            if last <= first:
+                return 0.0
+            return prefix[last - 1] - (prefix[first - 1] if first > 0 else 0.0)
+
+    def get_prefix(self, employee_id):
+        prefix = self.prefix.setdefault(employee_id, array('d'))
+        dirty_from = self.dirty_from.pop(employee_id, None)
+        if dirty_from is not None:
+            deltas = self.deltas[employee_id]
+            dirty_from = min(dirty_from, len(prefix))
+            del prefix[dirty_from:]
+            running_total = prefix[-1] if prefix else 0.0
+            for hours_delta in deltas[dirty_from:]:
+                running_total += hours_delta
+                prefix.append(running_total)
+        return prefix
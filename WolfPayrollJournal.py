@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+import time
+from WolfPayrollDays import parse_iso_day, format_day
+
+class PayrollJournal:
+    # Each record is the full state of one employee/date after a change:
+    # [employee_id, "YYYY-MM-DD", work_hours, added_hours]. Replaying a record twice
+    # is harmless, so a crash between writing a snapshot and truncating the journal is safe.
+    def __init__(self, directory, name, commit_interval=0.05, snapshot_every=5000):
+        self.directory = directory
+        self.journal_path = os.path.join(directory, f"{name}.journal")
+        self.snapshot_path = os.path.join(directory, f"{name}.snapshot")
+        self.rejected_path = os.path.join(directory, f"{name}.rejected")
+        self.commit_interval = commit_interval
+        self.snapshot_every = snapshot_every
+        self.payroll_calendar = None
+        self.pending = []
+        self.records_since_snapshot = 0
+        # Records are numbered as they are queued; wait_flushed() blocks a writer until the group
+        # commit holding its last record is on disk
+        self.sequence = 0
+        self.flushed_sequence = 0
+        self.error = None
+        self.local = threading.local()
+        # Last record read for each frozen day, and those that disagree with the frozen numbers
+        self.frozen_records = {}
+        self.rejected = []
+        self.closed = False
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.has_pending = threading.Condition(self.lock)
+        self.flushed = threading.Condition(self.lock)
+        os.makedirs(directory, exist_ok=True)
+        self.journal_file = None
+        self.flusher = None
+
+    def attach(self, payroll_calendar):
+        self.payroll_calendar = payroll_calendar
+        self.load()
+        self.journal_file = open(self.journal_path, 'a', encoding='utf-8')
+        self.flusher = threading.Thread(target=self.run_flusher, name="payroll-journal", daemon=True)
+        self.flusher.start()
+        payroll_calendar.add_listener(self.record)
+        payroll_calendar.journal = self
+        if self.rejected:
+            # Kept in <name>.rejected for re-entry by hand; compacting then takes them out of the journal
+            if self.save_rejected():
+                self.compact()
+        elif self.records_since_snapshot >= self.snapshot_every:
+            self.compact()
+
+    def replay(self, payroll_calendar):
+        # Reads the snapshot and journal into payroll_calendar without taking over the files
+        self.payroll_calendar = payroll_calendar
+        self.load()
+
+    def load(self):
+        try:
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, encoding='utf-8') as snapshot_file:
+                    for record in json.load(snapshot_file)['days']:
+                        self.apply(record)
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, encoding='utf-8') as journal_file:
+                    for line in journal_file:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # A torn final write from a crash; everything before it is intact
+                            print(f"Skipping unreadable journal record: {line.strip()}")
+                            continue
+                        self.apply(record)
+                        self.records_since_snapshot += 1
+            self.check_frozen_records()
+        except Exception as e:
+            print(f"Error loading payroll journal: {e}")
+
+    def apply(self, record):
+        employee_id, date_str, work_hours, added_hours = record
+        day = parse_iso_day(date_str)
+        if self.payroll_calendar.is_frozen(day):
+            self.frozen_records[(employee_id, day)] = record
+            return
+        self.payroll_calendar.write_days({(employee_id, day): (work_hours, added_hours)})
+
+    def check_frozen_records(self):
+        # Records from before a freeze match the frozen numbers. One that does not was journaled after
+        # the period was frozen elsewhere, and would otherwise be lost without a word.
+        for (employee_id, day), record in self.frozen_records.items():
+            if (self.payroll_calendar.get_work_hours(employee_id, day), self.payroll_calendar.get_added_hours(employee_id, day)) != tuple(record[2:]):
+                print(f"WARNING: journal record {json.dumps(record)} is in a closed pay period and was not applied.")
+                self.rejected.append(record)
+        self.frozen_records = {}
+
+    def save_rejected(self):
+        try:
+            with open(self.rejected_path, 'a', encoding='utf-8') as rejected_file:
+                rejected_file.writelines(json.dumps(record) + "\n" for record in self.rejected)
+                rejected_file.flush()
+                os.fsync(rejected_file.fileno())
+            print(f"WARNING: {len(self.rejected)} journal records in closed pay periods were saved to {self.rejected_path}.")
+            return True
+        except Exception as e:
+            print(f"Error saving rejected journal records: {e}")
+            return False
+
+    def record(self, change):
+        line = json.dumps([change.employee_id, format_day(change.day, '%Y-%m-%d'), change.work_hours, change.added_hours])
+        with self.lock:
+            self.pending.append(line)
+            self.records_since_snapshot += 1
+            self.sequence += 1
+            self.local.sequence = self.sequence
+            self.has_pending.notify()
+
+    def wait_flushed(self):
+        # Called from PayrollCalendar.commit() on the thread that made the edits
+        sequence = getattr(self.local, 'sequence', 0)
+        with self.lock:
+            while self.flushed_sequence < sequence and self.error is None and self.journal_file is not None:
+                self.flushed.wait()
+            if self.flushed_sequence < sequence:
+                raise OSError(f"payroll edits were not saved to {self.journal_path}: {self.error or 'journal closed'}")
+
+    def run_flusher(self):
+        while True:
+            with self.lock:
+                while not self.pending and not self.closed:
+                    self.has_pending.wait()
+                if self.closed and not self.pending:
+                    return
+            # Let a burst of edits accumulate so they share one fsync
+            time.sleep(self.commit_interval)
+            self.flush()
+            # Compacting here rather than in record() keeps the snapshot read out of the writers' way
+            if self.records_since_snapshot >= self.snapshot_every:
+                self.compact()
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                lines, self.pending = self.pending, []
+                sequence = self.sequence
+            if not lines or self.journal_file is None:
+                return
+            try:
+                self.journal_file.write("\n".join(lines) + "\n")
+                self.journal_file.flush()
+                os.fsync(self.journal_file.fileno())
+            except Exception as e:
+                print(f"Error writing payroll journal: {e}")
+                with self.lock:
+                    self.error = e
+                    self.flushed.notify_all()
+                return
+            with self.lock:
+                self.flushed_sequence = sequence
+                self.flushed.notify_all()
+
+    def compact(self):
+        with self.write_lock:
+            try:
+                days = self.payroll_calendar.write_sequence.read(self.get_snapshot_days)
+                temp_path = self.snapshot_path + ".tmp"
+                with open(temp_path, 'w', encoding='utf-8') as snapshot_file:
+                    json.dump({'version': 1, 'days': days}, snapshot_file)
+                    snapshot_file.flush()
+                    os.fsync(snapshot_file.fileno())
+                os.replace(temp_path, self.snapshot_path)
+                # Every line already in the journal file is covered by the snapshot. Pending lines are
+                # kept: some may be newer than the snapshot, and replaying an older one first is harmless.
+                with self.lock:
+                    self.records_since_snapshot = len(self.pending)
+                self.journal_file.close()
+                self.journal_file = open(self.journal_path, 'w', encoding='utf-8')
+                os.fsync(self.journal_file.fileno())
+            except Exception as e:
+                print(f"Error compacting payroll journal: {e}")
+
+    def get_snapshot_days(self):
+        return [[employee_id, format_day(day, '%Y-%m-%d'),
+                 self.payroll_calendar.get_work_hours(employee_id, day),
+                 self.payroll_calendar.get_added_hours(employee_id, day)]
+                for employee_id, day in self.payroll_calendar.storage.iter_changed_days()]
+
+    def close(self):
+        if self.payroll_calendar is not None and self.payroll_calendar.journal is self:
+            self.payroll_calendar.remove_listener(self.record)
+            self.payroll_calendar.journal = None
+        with self.lock:
+            self.closed = True
+            self.has_pending.notify()
+        if self.flusher is not None:
+            self.flusher.join()
+        self.flush()
+        if self.journal_file is not None:
+            self.journal_file.close()
+            with self.lock:
+                self.journal_file = None
+                self.flushed.notify_all()
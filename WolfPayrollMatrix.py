@@ -0,0 +1,56 @@
+import numpy as np
+
+class PeriodMatrix:
+    # Employees x days of one pay period, with preset and added hours as separate layers.
+    # Totals are kept alongside so a single-day edit only adjusts one row and one column.
+    def __init__(self, period_index, days, employee_ids, preset, added):
+        self.period_index = period_index
+        self.days = days
+        self.employee_ids = employee_ids
+        self.row_index = {employee_id: row for row, employee_id in enumerate(employee_ids)}
+        self.preset = preset
+        self.added = added
+        self.employee_totals = (preset + added).sum(axis=1)
+        self.day_totals = (preset + added).sum(axis=0)
+
+    def get_column(self, day):
+        return day - self.days[0]
+
+    def get_employee_total(self, employee_id):
+        return float(self.employee_totals[self.row_index[employee_id]])
+
+    def get_total(self):
+        return float(self.day_totals.sum())
+
+    def get_row(self, employee_id):
+        row = self.row_index[employee_id]
+        return self.preset[row].tolist(), self.added[row].tolist()
+
+    def set_day(self, employee_id, day, preset_hours, added_hours):
+        row, column = self.row_index[employee_id], self.get_column(day)
+        hours_delta = (preset_hours + added_hours) - (self.preset[row, column] + self.added[row, column])
+        self.preset[row, column] = preset_hours
+        self.added[row, column] = added_hours
+        self.employee_totals[row] += hours_delta
+        self.day_totals[column] += hours_delta
+
+def build_period_matrix(payroll_calendar, period_index):
+    period_start, period_end = payroll_calendar.get_period_range(period_index)
+    days = np.arange(period_start, period_end + 1)
+    employee_ids = list(payroll_calendar.employees)
+    schedule = np.array([payroll_calendar.employees[employee_id].work_schedule for employee_id in employee_ids], dtype=float).reshape(len(employee_ids), 7)
+
+    # Weekly rules broadcast across the period; days before the calendar start have no preset hours
+    preset = schedule[:, (days - 1) % 7]
+    preset[:, days < payroll_calendar.start_day] = 0.0
+    added = np.zeros_like(preset)
+
+    row_index = {employee_id: row for row, employee_id in enumerate(employee_ids)}
+    for layer, bucket in ((preset, payroll_calendar.get_period_overrides(period_index)), (added, payroll_calendar.get_period_payroll(period_index))):
+        for employee_id, hours_by_day in bucket.items():
+            row = row_index.get(employee_id)
+            if row is not None:
+                for day, hours in hours_by_day.items():
+                    layer[row, day - period_start] = hours
+
+    return PeriodMatrix(period_index, days.tolist(), employee_ids, preset, added)
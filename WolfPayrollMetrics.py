@@ -0,0 +1,120 @@
+import functools
+import json
+import os
+import time
+from bisect import bisect_left
+
+# Upper bounds of the latency buckets in milliseconds; the last bucket catches everything slower
+BUCKET_LIMITS_MS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float('inf'))
+
+class OperationStats:
+    __slots__ = ('count', 'total_ms', 'max_ms', 'entries', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.entries = 0
+        self.buckets = [0] * len(BUCKET_LIMITS_MS)
+
+    def add(self, elapsed_ms, entries):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.entries += entries
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        self.buckets[bisect_left(BUCKET_LIMITS_MS, elapsed_ms)] += 1
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding the given fraction of calls
+        target = self.count * fraction
+        seen = 0
+        for limit, bucket_count in zip(BUCKET_LIMITS_MS, self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                return min(limit, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 4) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.5), 4),
+            'p95_ms': round(self.percentile(0.95), 4),
+            'max_ms': round(self.max_ms, 4),
+            'entries': self.entries,
+            'histogram': {str(limit): bucket_count for limit, bucket_count in zip(BUCKET_LIMITS_MS, self.buckets) if bucket_count},
+        }
+
+class PayrollMetrics:
+    # Call counts, latency histograms and entries touched per operation name. Recording costs two
+    # perf_counter calls and a few integer updates; the optional JSON log is a buffered file
+    # with one line per operation, flushed when the log is closed.
+    def __init__(self, log_path=None):
+        self.operations = {}
+        # Running totals of payroll days changed and grid rows written; timed() reports the difference
+        self.counters = {'days': 0, 'rows': 0}
+        self.log_file = None
+        if log_path:
+            self.open_log(log_path)
+
+    def open_log(self, log_path):
+        self.close_log()
+        os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+        self.log_file = open(log_path, 'a', encoding='utf-8')
+
+    def touch(self, counter='days', count=1):
+        self.counters[counter] += count
+
+    def record(self, name, elapsed_ms, entries, context=None):
+        stats = self.operations.get(name)
+        if stats is None:
+            stats = self.operations[name] = OperationStats()
+        stats.add(elapsed_ms, entries)
+        if self.log_file is not None:
+            try:
+                self.log_file.write(json.dumps({'time': round(time.time(), 3), 'op': name, 'ms': round(elapsed_ms, 4),
+                                                'entries': entries, 'context': context}) + "\n")
+            except Exception as e:
+                print(f"Error writing metrics log: {e}")
+
+    def snapshot(self):
+        return {name: stats.to_dict() for name, stats in sorted(self.operations.items())}
+
+    def format_table(self):
+        lines = [f"{'operation':<28}{'calls':>8}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}{'entries':>10}"]
+        for name, stats in sorted(self.operations.items()):
+            summary = stats.to_dict()
+            lines.append(f"{name:<28}{summary['count']:>8}{summary['mean_ms']:>10.3f}{summary['p95_ms']:>10.3f}"
+                         f"{summary['max_ms']:>10.3f}{summary['entries']:>10}")
+        return "\n".join(lines)
+
+    def reset(self):
+        self.operations = {}
+
+    def close_log(self):
+        if self.log_file is not None:
+            try:
+                self.log_file.write(json.dumps({'time': round(time.time(), 3), 'summary': self.snapshot()}) + "\n")
+                self.log_file.close()
+            except Exception as e:
+                print(f"Error closing metrics log: {e}")
+            self.log_file = None
+
+default_metrics = PayrollMetrics()
+
+def timed(name, counter='days'):
+    # Method decorator; the instance supplies `metrics` and, if it has one, a `location` for the log
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            entries_before = metrics.counters[counter]
+            started = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                metrics.record(name, (time.perf_counter() - started) * 1000.0,
+                               metrics.counters[counter] - entries_before, getattr(self, 'location', None))
+        return wrapper
+    return decorator
@@ -0,0 +1,33 @@
+from WolfPayrollDays import get_week_start
+from WolfPayrollIndex import ChangeIndex
+
+OVERTIME_THRESHOLD = 40.0
+
+class OvertimeIndex(ChangeIndex):
+    # Per employee, hours beyond the weekly rule for each ISO week (keyed by its Monday).
+    # A week's total is the rule's closed-form sum plus that delta, so a change event costs
+    # one dictionary update and any employee/week can be split into regular and overtime hours.
+    def __init__(self, payroll_calendar, threshold=OVERTIME_THRESHOLD):
+        super().__init__(payroll_calendar)
+        self.threshold = threshold
+        self.week_deltas = {}
+
+    def reset(self):
+        self.week_deltas = {}
+
+    def apply_change(self, change):
+        self.add_delta(change.employee_id, change.day, change.hours_after - change.hours_before)
+
+    def add_delta(self, employee_id, day, hours_delta):
+        employee_weeks = self.week_deltas.setdefault(employee_id, {})
+        week_start = get_week_start(day)
+        employee_weeks[week_start] = employee_weeks.get(week_start, 0.0) + hours_delta
+
+    def get_week_total(self, employee_id, day):
+        self.build_once()
+        week_start = get_week_start(day)
+        scheduled_hours = self.payroll_calendar.get_scheduled_total(employee_id, week_start, week_start + 6)
+        return scheduled_hours + self.week_deltas.get(employee_id, {}).get(week_start, 0.0)
+
+    def split_hours(self, week_total):
+        return min(week_total, self.threshold), max(0.0, week_total - self.threshold)
@@ -0,0 +1,42 @@
+from bisect import bisect_left
+
+class EmployeeSearchIndex:
+    # Sorted array of lowercase search keys (the employee ID, the full name and each word of the
+    # name) with the roster position each key belongs to. A prefix matches one contiguous slice,
+    # found with two bisects, so a keystroke costs O(log n) plus the number of matches.
+    def __init__(self, employees):
+        self.employee_ids = list(employees)
+        self.employees = employees
+        self.keys = None
+        self.positions = None
+
+    def build(self):
+        entries = []
+        for position, employee_id in enumerate(self.employee_ids):
+            name = self.employees[employee_id].name.lower()
+            tokens = {employee_id.lower(), name}
+            tokens.update(name.split())
+            entries.extend((token, position) for token in tokens)
+        entries.sort()
+        self.keys = [token for token, position in entries]
+        self.positions = [position for token, position in entries]
+
+    def match_prefix(self, prefix):
+        first = bisect_left(self.keys, prefix)
+        last = bisect_left(self.keys, prefix + '\uffff', first)
+        return set(self.positions[first:last])
+
+    def search(self, query):
+        # Every word of the query has to prefix-match some key; results keep roster order
+        words = query.lower().split()
+        if not words:
+            return list(self.employee_ids)
+        if self.keys is None:
+            self.build()
+        matches = None
+        for word in sorted(words, key=len, reverse=True):
+            word_matches = self.match_prefix(word)
+            matches = word_matches if matches is None else matches & word_matches
+            if not matches:
+                return []
+        return [self.employee_ids[position] for position in sorted(matches)]
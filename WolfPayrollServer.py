@@ -0,0 +1,293 @@
+import argparse
+import asyncio
+import json
+import sys
+import urllib.error
+import urllib.request
+from urllib.parse import parse_qs, urlencode, urlsplit
+from WolfPayrollBatch import parse_records
+from WolfPayrollCalendar import LocationRegistry
+from WolfPayrollConcurrency import LocationLockedError
+from WolfPayrollDays import format_day, parse_iso_day
+from WolfPayrollTransaction import TransactionError
+
+# Local HTTP/JSON API; dates are YYYY-MM-DD and bodies use the batch CSV field names.
+#   GET  /locations
+#   GET  /locations/<key>/period?index=N | date=YYYY-MM-DD [&search=text]
+#   GET  /locations/<key>/totals?start=YYYY-MM-DD&end=YYYY-MM-DD[&employee_ids=1,2]
+#   POST /locations/<key>/add      {"employee_id", "date", "hours"}
+#   POST /locations/<key>/remove   {"employee_id", "date", "hours"}
+#   POST /locations/<key>/switch   {"employee_id", "date", "employee_id_2", "date_2"}
+#   POST /locations/<key>/batch    {"operations": [{"action", ...}, ...]}, applied all or nothing
+DEFAULT_PORT = 8765
+API_DATE_FORMAT = "%Y-%m-%d"
+MAX_BODY_BYTES = 1 << 20
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status, message, errors=None):
+        super().__init__(message)
+        self.status = status
+        self.errors = errors
+
+class PayrollServer:
+    # Reads run on the event loop and take consistent snapshots of the calendar, so they never wait
+    # for a writer. Writes to a location queue on that location's lock and are validated and applied
+    # as one transaction on an executor thread; the reply is only sent once they are on disk.
+    def __init__(self, registry, host="127.0.0.1", port=DEFAULT_PORT):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.location_keys = set(registry.keys())
+        self.write_locks = {}
+        self.load_lock = None
+        self.server = None
+
+    async def start(self):
+        self.load_lock = asyncio.Lock()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Serving payroll API on http://{self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                keep_alive = False
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                    headers = await read_headers(reader)
+                    keep_alive = version == "HTTP/1.1" and headers.get('connection', '').lower() != "close"
+                    content_length = int(headers.get('content-length') or 0)
+                    if content_length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise HTTPError(413, f"request body over {MAX_BODY_BYTES} bytes")
+                    body = await reader.readexactly(content_length) if content_length else b""
+                    status, payload = 200, await self.dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                    if e.errors is not None:
+                        payload['errors'] = e.errors
+                except TransactionError as e:
+                    status, payload = 409, {'error': "nothing applied", 'errors': e.errors}
+                except ValueError as e:
+                    status, payload = 400, {'error': str(e)}
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as e:
+                    print(f"Error handling request: {e}")
+                    status, payload = 500, {'error': str(e)}
+                await send_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if parts == ["locations"]:
+            if method != "GET":
+                raise HTTPError(405, f"{method} not allowed on /locations")
+            return {'locations': sorted(self.location_keys)}
+        if len(parts) != 3 or parts[0] != "locations" or parts[1] not in self.location_keys:
+            raise HTTPError(404, f"no such resource: {url.path}")
+        location_key, resource = parts[1], parts[2]
+        payroll_calendar = await self.get_calendar(location_key)
+
+        if resource in ("period", "totals"):
+            if method != "GET":
+                raise HTTPError(405, f"{method} not allowed on {resource}")
+            if resource == "period":
+                return get_period_view(payroll_calendar, query)
+            return get_totals(payroll_calendar, query)
+        if resource in ("add", "remove", "switch", "batch"):
+            if method != "POST":
+                raise HTTPError(405, f"{method} not allowed on {resource}")
+            request = parse_body(body)
+            records = request.get('operations') if resource == "batch" else [dict(request, action=resource)]
+            return await self.write(location_key, payroll_calendar, records)
+        raise HTTPError(404, f"no such resource: {url.path}")
+
+    async def get_calendar(self, location_key):
+        # Loading replays the location's journal, so it runs in a thread; one load at a time
+        if location_key in self.registry.calendars:
+            return self.registry.calendars[location_key]
+        async with self.load_lock:
+            return await asyncio.get_running_loop().run_in_executor(None, self.registry.get, location_key)
+
+    async def write(self, location_key, payroll_calendar, records):
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise HTTPError(400, "operations must be a list of objects")
+        records = [{name: '' if value is None else str(value) for name, value in record.items()} for record in records]
+        operations, errors = parse_records(records, payroll_calendar, API_DATE_FORMAT, row_label="operation")
+        if errors:
+            raise HTTPError(400, "invalid operations", errors)
+        if not operations:
+            raise HTTPError(400, "no operations")
+
+        write_lock = self.write_locks.setdefault(location_key, asyncio.Lock())
+        async with write_lock:
+            transaction = payroll_calendar.transaction()
+            transaction.extend(operations)
+            # commit() waits for the journal fsync of the edits made on its own thread, so both run in one call
+            days_changed = await asyncio.get_running_loop().run_in_executor(None, transaction.commit)
+        return {'operations': len(operations), 'days_changed': days_changed}
+
+async def read_headers(reader):
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode('latin-1').partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+async def send_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode('latin-1') + body)
+    await writer.drain()
+
+def parse_body(body):
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError as e:
+        raise HTTPError(400, f"invalid JSON: {e}")
+    if not isinstance(request, dict):
+        raise HTTPError(400, "request body must be a JSON object")
+    return request
+
+def get_period_view(payroll_calendar, query):
+    if 'index' in query:
+        period_index = int(query['index'])
+    elif 'date' in query:
+        period_index = payroll_calendar.get_period_index(parse_iso_day(query['date']))
+    else:
+        period_index = payroll_calendar.get_period_index(payroll_calendar.calculate_current_pay_period()[0])
+    if period_index < 0:
+        raise HTTPError(400, "pay period is before the calendar start date")
+    period_matrix = payroll_calendar.get_period_matrix(period_index)
+    employee_ids = payroll_calendar.search_employees(query.get('search', ''))
+    employees = []
+    for employee_id in employee_ids:
+        preset_hours, added_hours = period_matrix.get_row(employee_id)
+        employees.append({'employee_id': employee_id, 'name': payroll_calendar.get_employee_name(employee_id),
+                          'preset_hours': preset_hours, 'added_hours': added_hours,
+                          'total_hours': period_matrix.get_employee_total(employee_id)})
+    return {'location': payroll_calendar.location, 'period_index': period_index,
+            'days': [format_day(day, API_DATE_FORMAT) for day in period_matrix.days],
+            'employees': employees, 'day_totals': period_matrix.day_totals.tolist(), 'total_hours': period_matrix.get_total()}
+
+def get_totals(payroll_calendar, query):
+    if 'start' in query and 'end' in query:
+        start_day, end_day = parse_iso_day(query['start']), parse_iso_day(query['end'])
+    else:
+        start_day, end_day = payroll_calendar.calculate_current_pay_period()
+    employee_ids = None
+    if query.get('employee_ids'):
+        employee_ids = [employee_id for employee_id in query['employee_ids'].split(",") if employee_id in payroll_calendar.employees]
+    return {'location': payroll_calendar.location, 'start': format_day(start_day, API_DATE_FORMAT),
+            'end': format_day(end_day, API_DATE_FORMAT), 'totals': payroll_calendar.get_total_hours(start_day, end_day, employee_ids)}
+
+class PayrollClientError(ValueError):
+    def __init__(self, status, message, errors=None):
+        super().__init__(f"{status}: {message}" + (": " + "; ".join(errors) if errors else ""))
+        self.status = status
+        self.errors = errors or []
+
+class PayrollClient:
+    # Blocking client for scripts or another front end; days are ordinals, as in PayrollCalendar
+    def __init__(self, base_url=f"http://127.0.0.1:{DEFAULT_PORT}", timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, method, path, payload=None, **params):
+        url = self.base_url + path + (f"?{urlencode(params)}" if params else "")
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(url, data=data, method=method, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                error = json.loads(e.read())
+            except ValueError:
+                error = {'error': e.reason}
+            raise PayrollClientError(e.code, error.get('error'), error.get('errors'))
+
+    def get_locations(self):
+        return self.request("GET", "/locations")['locations']
+
+    def get_period(self, location_key, period_index=None, search=None):
+        params = {}
+        if period_index is not None:
+            params['index'] = period_index
+        if search:
+            params['search'] = search
+        return self.request("GET", f"/locations/{location_key}/period", **params)
+
+    def get_totals(self, location_key, start_day, end_day, employee_ids=None):
+        params = {'start': format_day(start_day, API_DATE_FORMAT), 'end': format_day(end_day, API_DATE_FORMAT)}
+        if employee_ids:
+            params['employee_ids'] = ",".join(employee_ids)
+        return self.request("GET", f"/locations/{location_key}/totals", **params)['totals']
+
+    def add_hours(self, location_key, employee_id, day, hours):
+        return self.request("POST", f"/locations/{location_key}/add",
+                            {'employee_id': employee_id, 'date': format_day(day, API_DATE_FORMAT), 'hours': hours})
+
+    def remove_hours(self, location_key, employee_id, day, hours):
+        return self.request("POST", f"/locations/{location_key}/remove",
+                            {'employee_id': employee_id, 'date': format_day(day, API_DATE_FORMAT), 'hours': hours})
+
+    def switch_shifts(self, location_key, employee_id_1, employee_id_2, day_1, day_2):
+        return self.request("POST", f"/locations/{location_key}/switch",
+                            {'employee_id': employee_id_1, 'date': format_day(day_1, API_DATE_FORMAT),
+                             'employee_id_2': employee_id_2, 'date_2': format_day(day_2, API_DATE_FORMAT)})
+
+    def apply_batch(self, location_key, records):
+        return self.request("POST", f"/locations/{location_key}/batch", {'operations': records})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the payroll calendars over a local HTTP/JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--sqlite", help="SQLite database used by the GUI, if any")
+    args = parser.parse_args(argv)
+
+    registry = LocationRegistry(sqlite_path=args.sqlite)
+    try:
+        # The server is the single writer for every location, so it takes them all before accepting clients
+        for location_key in registry.keys():
+            registry.get(location_key)
+    except LocationLockedError as e:
+        print(f"Cannot start the server: {e}", file=sys.stderr)
+        registry.close()
+        return 1
+    try:
+        asyncio.run(PayrollServer(registry, args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        registry.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import json
+import sqlite3
+from WolfPayrollDays import parse_iso_day, format_day
+
+class MemoryStorage:
+    # Added hours and schedule overrides, each keyed period index -> employee ID -> day
+    def __init__(self):
+        self.payroll = {}
+        self.schedule_overrides = {}
+
+    def open(self, location, start_day, pay_period_length):
+        self.location = location
+        self.start_day = start_day
+        self.pay_period_length = pay_period_length
+
+    def period_index(self, day):
+        return (day - self.start_day) // self.pay_period_length
+
+    def save_employees(self, employees):
+        pass
+
+    def get_added_hours(self, employee_id, day):
+        return self.payroll.get(self.period_index(day), {}).get(employee_id, {}).get(day, 0)
+
+    def set_added_hours(self, employee_id, day, hours):
+        self._set_bucket_value(self.payroll, employee_id, day, hours)
+
+    def get_override(self, employee_id, day):
+        return self.schedule_overrides.get(self.period_index(day), {}).get(employee_id, {}).get(day)
+
+    def set_override(self, employee_id, day, hours):
+        self._set_bucket_value(self.schedule_overrides, employee_id, day, hours)
+
+    def get_period_added(self, period_index):
+        return self.payroll.get(period_index, {})
+
+    def get_period_overrides(self, period_index):
+        return self.schedule_overrides.get(period_index, {})
+
+    def get_added(self, start_day, end_day):
+        return self._get_range(self.payroll, start_day, end_day)
+
+    def get_overrides(self, start_day, end_day):
+        return self._get_range(self.schedule_overrides, start_day, end_day)
+
+    def sum_added_hours(self, start_day, end_day):
+        return {employee_id: sum(days.values()) for employee_id, days in self.get_added(start_day, end_day).items()}
+
+    def iter_changed_days(self):
+        changed_days = set()
+        for buckets in (self.schedule_overrides, self.payroll):
+            for period_bucket in buckets.values():
+                for employee_id, days in period_bucket.items():
+                    changed_days.update((employee_id, day) for day in days)
+        return sorted(changed_days)
+
+    def drop_periods(self, first_period, last_period):
+        for buckets in (self.schedule_overrides, self.payroll):
+            for period_index in [period_index for period_index in buckets if first_period <= period_index <= last_period]:
+                del buckets[period_index]
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+    def _get_range(self, buckets, start_day, end_day):
+        result = {}
+        for period_index in range(self.period_index(start_day), self.period_index(end_day) + 1):
+            for employee_id, days in buckets.get(period_index, {}).items():
+                for day, hours in days.items():
+                    if start_day <= day <= end_day:
+                        result.setdefault(employee_id, {})[day] = hours
+        return result
+
+    def _set_bucket_value(self, buckets, employee_id, day, value):
+        # A value of None removes the entry; empty levels are pruned
+        period_index = self.period_index(day)
+        if value is not None:
+            buckets.setdefault(period_index, {}).setdefault(employee_id, {})[day] = value
+            return
+        period_bucket = buckets.get(period_index, {})
+        employee_bucket = period_bucket.get(employee_id, {})
+        employee_bucket.pop(day, None)
+        if not employee_bucket:
+            period_bucket.pop(employee_id, None)
+        if not period_bucket:
+            buckets.pop(period_index, None)
+
+class SQLiteStorage:
+    # One row per employee/day that differs from the weekly rule or has added hours.
+    # work_hours is NULL when the rule applies. Writes are committed in batches.
+    def __init__(self, path, batch_size=500):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending_writes = 0
+        # The GUI hands loads and exports to a worker thread, one job at a time
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS employees (
+                location TEXT NOT NULL,
+                employee_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                work_schedule TEXT NOT NULL,
+                PRIMARY KEY (location, employee_id)
+            );
+            CREATE TABLE IF NOT EXISTS day_hours (
+                location TEXT NOT NULL,
+                employee_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                period_index INTEGER NOT NULL,
+                work_hours REAL,
+                added_hours REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (location, employee_id, day)
+            );
+            CREATE INDEX IF NOT EXISTS day_hours_by_period ON day_hours (location, period_index);
+            CREATE INDEX IF NOT EXISTS day_hours_by_day ON day_hours (location, day);
+        """)
+        self.connection.commit()
+
+    def open(self, location, start_day, pay_period_length):
+        self.location = location
+        self.start_day = start_day
+        self.pay_period_length = pay_period_length
+
+    def period_index(self, day):
+        return (day - self.start_day) // self.pay_period_length
+
+    def save_employees(self, employees):
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO employees (location, employee_id, name, work_schedule) VALUES (?, ?, ?, ?)",
+            [(self.location, employee_id, employee.name, json.dumps(list(employee.work_schedule)))
+             for employee_id, employee in employees.items()])
+        self.connection.commit()
+
+    def get_added_hours(self, employee_id, day):
+        row = self.connection.execute(
+            "SELECT added_hours FROM day_hours WHERE location = ? AND employee_id = ? AND day = ?",
+            (self.location, employee_id, self._day(day))).fetchone()
+        return row[0] if row else 0
+
+    def set_added_hours(self, employee_id, day, hours):
+        self._write(employee_id, day, "added_hours", hours if hours is not None else 0)
+
+    def get_override(self, employee_id, day):
+        row = self.connection.execute(
+            "SELECT work_hours FROM day_hours WHERE location = ? AND employee_id = ? AND day = ?",
+            (self.location, employee_id, self._day(day))).fetchone()
+        return row[0] if row else None
+
+    def set_override(self, employee_id, day, hours):
+        self._write(employee_id, day, "work_hours", hours)
+
+    def get_period_added(self, period_index):
+        return self._group(self.connection.execute(
+            "SELECT employee_id, day, added_hours FROM day_hours WHERE location = ? AND period_index = ? AND added_hours > 0",
+            (self.location, period_index)))
+
+    def get_period_overrides(self, period_index):
+        return self._group(self.connection.execute(
+            "SELECT employee_id, day, work_hours FROM day_hours WHERE location = ? AND period_index = ? AND work_hours IS NOT NULL",
+            (self.location, period_index)))
+
+    def get_added(self, start_day, end_day):
+        return self._group(self.connection.execute(
+            "SELECT employee_id, day, added_hours FROM day_hours WHERE location = ? AND day BETWEEN ? AND ? AND added_hours > 0",
+            (self.location, self._day(start_day), self._day(end_day))))
+
+    def get_overrides(self, start_day, end_day):
+        return self._group(self.connection.execute(
+            "SELECT employee_id, day, work_hours FROM day_hours WHERE location = ? AND day BETWEEN ? AND ? AND work_hours IS NOT NULL",
+            (self.location, self._day(start_day), self._day(end_day))))
+
+    def sum_added_hours(self, start_day, end_day):
+        return dict(self.connection.execute(
+            "SELECT employee_id, SUM(added_hours) FROM day_hours WHERE location = ? AND day BETWEEN ? AND ? GROUP BY employee_id",
+            (self.location, self._day(start_day), self._day(end_day))))
+
+    def iter_changed_days(self):
+        return [(employee_id, parse_iso_day(day)) for employee_id, day in self.connection.execute(
+            "SELECT employee_id, day FROM day_hours WHERE location = ? ORDER BY employee_id, day", (self.location,))]
+
+    def drop_periods(self, first_period, last_period):
+        self.connection.execute("DELETE FROM day_hours WHERE location = ? AND period_index BETWEEN ? AND ?",
+                                (self.location, first_period, last_period))
+        self.connection.commit()
+        self.pending_writes = 0
+
+    def commit(self):
+        if self.pending_writes:
+            self.connection.commit()
+            self.pending_writes = 0
+
+    def close(self):
+        self.commit()
+        self.connection.close()
+
+    def _day(self, day):
+        # Days are stored as ISO text so the database stays readable and sorts by date
+        return format_day(day, '%Y-%m-%d')
+
+    def _group(self, rows):
+        result = {}
+        for employee_id, day, hours in rows:
+            result.setdefault(employee_id, {})[parse_iso_day(day)] = hours
+        return result
+
+    def _write(self, employee_id, day, column, value):
+        day_str = self._day(day)
+        self.connection.execute(
+            f"INSERT INTO day_hours (location, employee_id, day, period_index, {column}) VALUES (?, ?, ?, ?, ?) "
+            f"ON CONFLICT (location, employee_id, day) DO UPDATE SET {column} = excluded.{column}",
+            (self.location, employee_id, day_str, self.period_index(day), value))
+        self.connection.execute(
+            "DELETE FROM day_hours WHERE location = ? AND employee_id = ? AND day = ? AND work_hours IS NULL AND added_hours <= 0",
+            (self.location, employee_id, day_str))
+        # Uncommitted rows are visible to this connection, so reads stay correct between commits
+        self.pending_writes += 1
+        if self.pending_writes >= self.batch_size:
+            self.commit()
@@ -0,0 +1,168 @@
+from WolfPayrollConcurrency import MAX_WRITE_ATTEMPTS
+from WolfPayrollDays import format_day
+from WolfPayrollMetrics import timed
+
+class TransactionError(ValueError):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} problems, nothing applied: " + "; ".join(errors[:5]))
+        self.errors = errors
+
+class PayrollTransaction:
+    # Queues add/remove/switch operations, in the same tuple form the batch tool uses, and applies
+    # them together. validate() replays them against a scratch copy of the days they touch, so a
+    # batch is either written in full or not at all; a storage failure while writing restores
+    # every day already written. The write is a compare-and-swap on the versions of the employees
+    # involved, so if another writer got to them first the batch is validated again.
+    def __init__(self, payroll_calendar, closed_before=None):
+        self.payroll_calendar = payroll_calendar
+        self.closed_before = closed_before if closed_before is not None else payroll_calendar.start_day
+        self.metrics = payroll_calendar.metrics
+        self.location = payroll_calendar.location
+        self.operations = []
+        self.days = None
+        self.originals = None
+        self.versions = None
+        self.switched = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        return False
+
+    def add_hours(self, employee_id, day, hours):
+        self.operations.append(('add', employee_id, day, hours))
+
+    def remove_hours(self, employee_id, day, hours):
+        self.operations.append(('remove', employee_id, day, hours))
+
+    def switch_shifts(self, employee_id_1, employee_id_2, day_1, day_2):
+        self.operations.append(('switch', employee_id_1, day_1, employee_id_2, day_2))
+
+    def extend(self, operations):
+        self.operations.extend(operations)
+
+    def validate(self):
+        # Final [work_hours, added_hours] per (employee, day), starting from what the calendar holds now
+        self.days = {}
+        self.originals = {}
+        self.versions = {}
+        self.switched = []
+        errors = []
+        for number, operation in enumerate(self.operations, start=1):
+            try:
+                self.check(operation)
+            except ValueError as e:
+                errors.append(f"operation {number}: {e}")
+        return errors
+
+    def extend_valid(self, operations, progress=None):
+        # Queues each operation that applies on top of those before it and returns the rest as
+        # (position, error); a rejected operation leaves the running state untouched
+        if self.days is None:
+            self.validate()
+        rejected = []
+        for position, operation in enumerate(operations):
+            if progress is not None and position % 100 == 0:
+                progress(position, len(operations))
+            try:
+                self.check(operation)
+            except ValueError as e:
+                rejected.append((position, str(e)))
+                continue
+            self.operations.append(operation)
+        return rejected
+
+    def check(self, operation):
+        # Applies one operation to the running state, raising ValueError before changing anything
+        action = operation[0]
+        if action == 'add':
+            self._add(*operation[1:])
+        elif action == 'remove':
+            self._remove(*operation[1:])
+        elif action == 'switch':
+            self._switch(*operation[1:])
+        else:
+            raise ValueError(f"unknown action '{action}'")
+
+    @timed('commit_transaction')
+    def commit(self):
+        payroll_calendar = self.payroll_calendar
+        try:
+            for attempt in range(MAX_WRITE_ATTEMPTS):
+                changed_days = self.prepare()
+                if payroll_calendar.write_days(changed_days, self.versions):
+                    break
+            else:
+                # Still losing to other writers: validate again with the employees locked
+                with payroll_calendar.locked_employees(self.versions):
+                    changed_days = self.prepare()
+                    payroll_calendar.write_days(changed_days)
+        finally:
+            payroll_calendar.commit()
+        self.operations = []
+        return len(changed_days)
+
+    def prepare(self):
+        errors = self.validate()
+        if errors:
+            raise TransactionError(errors)
+        return {key: tuple(state) for key, state in self.days.items() if tuple(state) != self.originals[key]}
+
+    def _state(self, employee_id, day):
+        state = self.days.get((employee_id, day))
+        if state is None:
+            if self.payroll_calendar.is_frozen(day) or self.payroll_calendar.start_day <= day < self.closed_before:
+                raise ValueError(f"{format_day(day)} is in a closed pay period")
+            # The version is read first, so a write landing after it makes the compare-and-swap fail
+            if employee_id not in self.versions:
+                self.versions.update(self.payroll_calendar.get_versions([employee_id]))
+            state = self.days[(employee_id, day)] = [self.payroll_calendar.get_work_hours(employee_id, day),
+                                                     self.payroll_calendar.get_added_hours(employee_id, day)]
+            self.originals[(employee_id, day)] = tuple(state)
+        return state
+
+    def _check_employee(self, employee_id):
+        if employee_id not in self.payroll_calendar.employees:
+            raise ValueError(f"unknown employee ID '{employee_id}'")
+
+    def _add(self, employee_id, day, hours):
+        self._check_employee(employee_id)
+        if hours <= 0:
+            raise ValueError(f"hours must be positive, got {hours}")
+        self._state(employee_id, day)[1] += hours
+
+    def _remove(self, employee_id, day, hours):
+        # Same order as PayrollCalendar.remove_hours: added hours first, then the scheduled shift
+        self._check_employee(employee_id)
+        if hours <= 0:
+            raise ValueError(f"hours must be positive, got {hours}")
+        state = self._state(employee_id, day)
+        remaining_hours = hours - state[1]
+        if remaining_hours > 0:
+            if day < self.payroll_calendar.start_day:
+                raise ValueError(f"no preset hours found for {format_day(day)}")
+            if state[0] < remaining_hours:
+                raise ValueError(f"cannot remove {hours} hours, only {state[0] + state[1]} hours on {format_day(day)} for {employee_id}")
+            state[0] -= remaining_hours
+            state[1] = 0
+        else:
+            state[1] -= hours
+
+    def _switch(self, employee_id_1, day_1, employee_id_2, day_2):
+        self._check_employee(employee_id_1)
+        self._check_employee(employee_id_2)
+        hours_1 = self._state(employee_id_1, day_1)[0]
+        hours_2 = self._state(employee_id_2, day_2)[0]
+        # Every day involved is read before anything changes, so a closed day rejects the switch cleanly
+        self._state(employee_id_1, day_2)
+        self._state(employee_id_2, day_1)
+        if hours_1 <= 0 or hours_2 <= 0:
+            raise ValueError(f"cannot switch shifts, {employee_id_1} on {format_day(day_1)} or {employee_id_2} on {format_day(day_2)} has no hours")
+        self._remove(employee_id_1, day_1, hours_1)
+        self._add(employee_id_1, day_2, hours_2)
+        self._remove(employee_id_2, day_2, hours_2)
+        self._add(employee_id_2, day_1, hours_1)
+        self.switched.append((hours_1, hours_2))
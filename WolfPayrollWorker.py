@@ -0,0 +1,105 @@
+import queue
+import threading
+
+class JobCancelled(Exception):
+    pass
+
+class Job:
+    def __init__(self, worker, name, function, args, on_done, on_error, on_cancel):
+        self.worker = worker
+        self.name = name
+        self.function = function
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.cancel_requested = threading.Event()
+
+    def cancel(self):
+        self.cancel_requested.set()
+
+    def report(self, done, total, message=""):
+        # Called from the job itself on the worker thread; doubles as the cancellation point
+        if self.cancel_requested.is_set():
+            raise JobCancelled()
+        self.worker.results.put(('progress', self, (done, total, message)))
+
+class BackgroundWorker:
+    # One daemon thread runs jobs in the order they are submitted. Progress and results go back
+    # through a queue that the Tk thread drains with after(), so every callback runs on the Tk thread.
+    def __init__(self, root, on_progress=None, poll_interval=50):
+        self.root = root
+        self.on_progress = on_progress
+        self.poll_interval = poll_interval
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.active_jobs = []
+        self.poll_scheduled = False
+        self.thread = threading.Thread(target=self.run, name="payroll-worker", daemon=True)
+        self.thread.start()
+
+    def submit(self, name, function, *args, on_done=None, on_error=None, on_cancel=None):
+        # function is called as function(job, *args) and may call job.report(done, total, message)
+        job = Job(self, name, function, args, on_done, on_error, on_cancel)
+        self.active_jobs.append(job)
+        self.jobs.put(job)
+        self.schedule_poll()
+        return job
+
+    def is_busy(self):
+        return bool(self.active_jobs)
+
+    def cancel_all(self):
+        for job in self.active_jobs:
+            job.cancel()
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            try:
+                if job.cancel_requested.is_set():
+                    raise JobCancelled()
+                self.results.put(('done', job, job.function(job, *job.args)))
+            except JobCancelled:
+                self.results.put(('cancelled', job, None))
+            except Exception as e:
+                self.results.put(('error', job, e))
+
+    def schedule_poll(self):
+        if not self.poll_scheduled:
+            self.poll_scheduled = True
+            self.root.after(self.poll_interval, self.poll)
+
+    def poll(self):
+        self.poll_scheduled = False
+        while True:
+            try:
+                kind, job, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                if self.on_progress is not None:
+                    self.on_progress(job, *value)
+                continue
+            self.active_jobs.remove(job)
+            callback = {'done': job.on_done, 'error': job.on_error, 'cancelled': job.on_cancel}[kind]
+            try:
+                if kind == 'cancelled':
+                    if callback is not None:
+                        callback()
+                elif callback is not None:
+                    callback(value)
+                elif kind == 'error':
+                    print(f"Error in {job.name}: {value}")
+            except Exception as e:
+                print(f"Error finishing {job.name}: {e}")
+        if self.active_jobs:
+            self.schedule_poll()
+
+    def close(self):
+        self.cancel_all()
+        self.jobs.put(None)
+        # Only called once no job is active, so the thread exits as soon as it reads the None
+        self.thread.join()
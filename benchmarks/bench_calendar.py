@@ -0,0 +1,212 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from WolfPayrollCalendar import PayrollCalendar
+from WolfPayrollDays import today
+from WolfPayrollStorage import SQLiteStorage
+
+# Synthetic-scale timings for PayrollCalendar. Each scenario is a roster size and a history
+# length: the calendar starts that many years ago and already holds a spread of edits, as a
+# location would after years of use. Results are written as JSON so runs can be compared.
+SHIFT_LENGTHS = (0.0, 0.0, 0.0, 4.0, 6.0, 8.0)
+
+def generate_roster(employee_count, rng):
+    return [{'id': str(employee_id), 'name': f"Employee {employee_id}",
+             'work_schedule': [rng.choice(SHIFT_LENGTHS) for weekday in range(7)]}
+            for employee_id in range(1, employee_count + 1)]
+
+def make_storage(storage_name, directory):
+    if storage_name == 'sqlite':
+        return SQLiteStorage(os.path.join(directory, "bench.db"))
+    return None
+
+def apply_history(payroll_calendar, edit_count, rng):
+    employee_ids = list(payroll_calendar.employees)
+    span = today() - payroll_calendar.start_day
+    for _ in range(edit_count):
+        employee_id = rng.choice(employee_ids)
+        day = payroll_calendar.start_day + rng.randrange(span)
+        if rng.random() < 0.6:
+            payroll_calendar.add_hours(employee_id, day, rng.choice((1.0, 2.0, 4.0)))
+        else:
+            payroll_calendar.remove_hours(employee_id, day, rng.choice((1.0, 2.0, 4.0)))
+    payroll_calendar.commit()
+
+def summarize(samples):
+    samples = sorted(samples)
+    count = len(samples)
+    return {
+        'count': count,
+        'total_s': round(sum(samples), 6),
+        'mean_us': round(sum(samples) / count * 1e6, 2),
+        'p50_us': round(samples[count // 2] * 1e6, 2),
+        'p95_us': round(samples[min(count - 1, int(count * 0.95))] * 1e6, 2),
+        'max_us': round(samples[-1] * 1e6, 2),
+    }
+
+def time_calls(function, argument_list):
+    samples = []
+    for arguments in argument_list:
+        started = time.perf_counter()
+        function(*arguments)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+def run_scenario(employee_count, years, args):
+    rng = random.Random(args.seed)
+    roster = generate_roster(employee_count, rng)
+    start_day = today() - years * 365
+    start_date = datetime.combine(date.fromordinal(start_day), datetime.min.time())
+    history_edits = min(args.max_history_edits, int(employee_count * years * args.edits_per_employee_year))
+    metrics = {}
+
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        storage = make_storage(args.storage, directory)
+        started = time.perf_counter()
+        payroll_calendar = PayrollCalendar(start_date, storage=storage, location='bench', roster=roster)
+        metrics['init'] = summarize([time.perf_counter() - started])
+        metrics['initialize_employees'] = time_calls(payroll_calendar.initialize_employees, [(roster,)] * 3)
+
+        started = time.perf_counter()
+        apply_history(payroll_calendar, history_edits, rng)
+        metrics['history_load'] = summarize([time.perf_counter() - started])
+
+        employee_ids = list(payroll_calendar.employees)
+        period_start, period_end = payroll_calendar.current_pay_period()
+        period_days = payroll_calendar.get_period_days(period_start, period_end)
+        metrics['add_hours'] = time_calls(payroll_calendar.add_hours,
+                                          [(rng.choice(employee_ids), rng.choice(period_days), 2.0) for _ in range(args.operations)])
+        metrics['remove_hours'] = time_calls(payroll_calendar.remove_hours,
+                                             [(rng.choice(employee_ids), rng.choice(period_days), 1.0) for _ in range(args.operations)])
+        metrics['switch_shifts'] = time_calls(payroll_calendar.switch_shifts,
+                                              [(rng.choice(employee_ids), rng.choice(employee_ids), rng.choice(period_days), rng.choice(period_days))
+                                               for _ in range(args.operations)])
+        payroll_calendar.commit()
+
+        # Navigation walks back through the history one period at a time, building what the grid shows
+        navigation_steps = min(args.periods, payroll_calendar.get_current_period_index() + 1)
+        metrics['previous_period'] = time_calls(payroll_calendar.update_pay_period, [('previous',)] * navigation_steps)
+        metrics['next_period'] = time_calls(payroll_calendar.update_pay_period, [('next',)])
+        period_indexes = [rng.randrange(payroll_calendar.get_current_period_index() + 1) for _ in range(args.periods)]
+        metrics['display_model'] = time_calls(build_display_model, [(payroll_calendar, period_index) for period_index in period_indexes])
+
+        # The first range query builds the totals index from every changed day; later ones are lookups
+        metrics['first_total_hours'] = time_calls(payroll_calendar.get_total_hours, [(payroll_calendar.start_day, today())])
+        range_starts = [payroll_calendar.start_day + rng.randrange(today() - payroll_calendar.start_day + 1) for _ in range(args.periods)]
+        metrics['total_hours'] = time_calls(payroll_calendar.get_total_hours, [(range_start, today()) for range_start in range_starts])
+        payroll_calendar.close()
+
+    return {
+        'employees': employee_count,
+        'years': years,
+        'storage': args.storage,
+        'history_edits': history_edits,
+        'metrics': metrics,
+        'peak_memory_bytes': measure_peak_memory(roster, start_date, history_edits, args) if args.memory else None,
+    }
+
+def build_display_model(payroll_calendar, period_index):
+    # What PayrollApp needs for one period: the hours matrix, its footer and the visible rows
+    period_matrix = payroll_calendar.get_period_matrix(period_index)
+    period_matrix.day_totals.tolist()
+    for employee_id in period_matrix.employee_ids[:20]:
+        period_matrix.get_row(employee_id)
+        period_matrix.get_employee_total(employee_id)
+
+def measure_peak_memory(roster, start_date, history_edits, args):
+    # A separate pass, because tracemalloc slows every allocation and would skew the timings
+    rng = random.Random(args.seed + 1)
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        try:
+            payroll_calendar = PayrollCalendar(start_date, storage=make_storage(args.storage, directory), location='bench', roster=roster)
+            apply_history(payroll_calendar, history_edits, rng)
+            build_display_model(payroll_calendar, payroll_calendar.get_current_period_index())
+            payroll_calendar.get_total_hours(payroll_calendar.start_day, today())
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        payroll_calendar.close()
+    return peak
+
+def get_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+    baseline_scenarios = {(scenario['employees'], scenario['years'], scenario['storage']): scenario for scenario in baseline['scenarios']}
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}); ratio > 1 is slower:")
+    for scenario in results['scenarios']:
+        previous = baseline_scenarios.get((scenario['employees'], scenario['years'], scenario['storage']))
+        if previous is None:
+            continue
+        ratios = [f"{name} {metric['mean_us'] / previous['metrics'][name]['mean_us']:.2f}x"
+                  for name, metric in scenario['metrics'].items()
+                  if name in previous['metrics'] and previous['metrics'][name]['mean_us'] > 0]
+        print(f"  {scenario['employees']} employees, {scenario['years']} years: " + ", ".join(ratios))
+
+def parse_counts(value):
+    return [int(count) for count in value.split(",") if count]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time PayrollCalendar operations on synthetic rosters and histories.")
+    parser.add_argument("--employees", type=parse_counts, default=[10, 1000, 50000], help="comma-separated roster sizes")
+    parser.add_argument("--years", type=parse_counts, default=[1, 10], help="comma-separated history lengths in years")
+    parser.add_argument("--storage", choices=("memory", "sqlite"), default="memory")
+    parser.add_argument("--operations", type=int, default=1000, help="calls timed per mutation")
+    parser.add_argument("--periods", type=int, default=50, help="pay periods navigated and built")
+    parser.add_argument("--edits-per-employee-year", type=float, default=4.0)
+    parser.add_argument("--max-history-edits", type=int, default=200000)
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc pass")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    results = {
+        'commit': get_commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scenarios': [],
+    }
+    for employee_count in args.employees:
+        for years in args.years:
+            started = time.perf_counter()
+            scenario = run_scenario(employee_count, years, args)
+            results['scenarios'].append(scenario)
+            metrics = scenario['metrics']
+            memory = f", peak {scenario['peak_memory_bytes'] / 1e6:.1f} MB" if scenario['peak_memory_bytes'] is not None else ""
+            print(f"{employee_count} employees, {years} years ({scenario['history_edits']} edits): "
+                  f"init {metrics['init']['total_s']:.3f}s, add {metrics['add_hours']['mean_us']:.0f}us, "
+                  f"remove {metrics['remove_hours']['mean_us']:.0f}us, switch {metrics['switch_shifts']['mean_us']:.0f}us, "
+                  f"display {metrics['display_model']['mean_us'] / 1000:.1f}ms, "
+                  f"first totals {metrics['first_total_hours']['mean_us'] / 1000:.1f}ms{memory} [{time.perf_counter() - started:.1f}s]")
+
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Wrote {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_payroll_state import QuietTestCase, ROSTER, START_DATE, make_calendar
+from WolfPayrollBatch import apply_operations, parse_rows
+from WolfPayrollCalendar import LocationRegistry
+from WolfPayrollDays import today, format_day
+
+def write_location(directory, key='test', **settings):
+    locations_directory = os.path.join(directory, 'locations')
+    os.makedirs(locations_directory, exist_ok=True)
+    with open(os.path.join(locations_directory, f"{key}.json"), 'w', encoding='utf-8') as location_file:
+        json.dump(dict({'name': 'Test', 'start_date': START_DATE.isoformat(), 'employees': ROSTER}, **settings), location_file)
+    return locations_directory, os.path.join(directory, 'data')
+
+class ParseTest(QuietTestCase):
+    def test_every_bad_line_is_reported(self):
+        payroll_calendar = make_calendar()
+        day = format_day(today())
+        csv_file = io.StringIO("action,employee_id,date,hours,employee_id_2,date_2\n"
+                               f"add,1,{day},2.5,,\n"
+                               f"move,1,{day},1,,\n"
+                               f"add,99,{day},1,,\n"
+                               ",,,,,\n"
+                               f"remove,2,{day},0,,\n"
+                               f"add,2,{format_day(START_DATE.toordinal() - 1)},1,,\n"
+                               f"switch,3,{day},,4,{day}\n"
+                               f"switch,3,{day},,4,13/45/2020\n")
+        operations, errors = parse_rows(csv_file, payroll_calendar)
+        self.assertEqual(operations, [('add', '1', today(), 2.5), ('switch', '3', today(), '4', today())])
+        self.assertEqual([error.split(':')[0] for error in errors], ["line 3", "line 4", "line 6", "line 7", "line 9"])
+        self.assertEqual(errors[1], "line 4: unknown employee ID '99'")
+
+class ApplyTest(QuietTestCase):
+    def test_rejected_rows_are_left_out_and_the_rest_counted(self):
+        payroll_calendar = make_calendar()
+        day = next(day for day in range(today(), today() - 7, -1) if not payroll_calendar.get_work_hours('1', day))
+        operations = [('add', '1', day, 3.0), ('remove', '1', day, 5.0), ('add', '2', day, 1.0),
+                      ('remove', '1', day, 1.0), ('add', '1', day, 0.5)]
+        summary = apply_operations(payroll_calendar, operations)
+        self.assertEqual((summary['add'], summary['remove'], summary['hours_added'], summary['hours_removed']), (3, 1, 4.5, 1.0))
+        self.assertEqual((summary['days_changed'], summary['employees_touched']), (2, 2))
+        self.assertEqual(len(summary['warnings']), 1)
+        self.assertTrue(summary['warnings'][0].startswith(f"remove 5.0 hours for 1 on {format_day(day)}: cannot remove"))
+        self.assertEqual(payroll_calendar.get_added_hours('1', day), 2.5)
+
+class DryRunTest(QuietTestCase):
+    def test_dry_run_closes_what_the_writer_will_freeze(self):
+        # Nothing has been frozen yet; the first writer to open the location freezes every period ended a week ago
+        locations_directory, data_directory = write_location(self.directory.name)
+        operations = [('add', '1', START_DATE.toordinal() + 3, 2.0), ('add', '2', today(), 3.0)]
+        reader = LocationRegistry(locations_directory, data_directory, read_only=True)
+        payroll_calendar = reader.get('test')
+        self.assertFalse(payroll_calendar.is_frozen(START_DATE.toordinal() + 3))
+        rejected = payroll_calendar.transaction(reader.closed_before.get('test')).extend_valid(operations)
+        reader.close()
+
+        writer = LocationRegistry(locations_directory, data_directory)
+        summary = apply_operations(writer.get('test'), operations)
+        writer.close()
+        self.assertEqual([position for position, error in rejected], [0])
+        self.assertEqual(len(summary['warnings']), len(rejected))
+        self.assertEqual(summary['add'], 1)
+
+if __name__ == "__main__":
+    unittest.main()
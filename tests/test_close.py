@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_batch import write_location
+from test_payroll_state import QuietTestCase, apply_history
+import WolfPayrollClose
+from WolfPayrollCalendar import LocationRegistry
+from WolfPayrollClose import close_year, get_year_periods, summarize_period
+from WolfPayrollDays import today, to_date, get_week_start
+
+class YearEndCloseTest(QuietTestCase):
+    def setUp(self):
+        super().setUp()
+        self.locations_directory, self.data_directory = write_location(self.directory.name)
+        writer = LocationRegistry(self.locations_directory, self.data_directory)
+        apply_history(writer.get('test'))
+        writer.close()
+        self.registry = LocationRegistry(self.locations_directory, self.data_directory, read_only=True)
+        self.payroll_calendar = self.registry.get('test')
+        # A year with at least a couple of ended pay periods in it
+        self.year = to_date(today() - 40).year
+
+    def tearDown(self):
+        if WolfPayrollClose.worker_registry is not None:
+            WolfPayrollClose.worker_registry.close()
+            WolfPayrollClose.worker_registry = None
+        self.registry.close()
+        super().tearDown()
+
+    def test_only_ended_periods_of_the_year(self):
+        first_period, last_period = get_year_periods(self.payroll_calendar, self.year)
+        self.assertLess(last_period, self.payroll_calendar.get_current_period_index())
+        self.assertEqual(last_period + 1, min(self.payroll_calendar.get_current_period_index(),
+                                              self.payroll_calendar.get_period_index(date(self.year + 1, 1, 1).toordinal())))
+        for period_index in range(first_period, last_period + 1):
+            self.assertEqual(to_date(self.payroll_calendar.get_period_range(period_index)[1]).year, self.year)
+        if first_period > 0:
+            self.assertLess(to_date(self.payroll_calendar.get_period_range(first_period - 1)[1]).year, self.year)
+
+    def test_summary_matches_the_calendar(self):
+        payroll_calendar = self.payroll_calendar
+        overtime_total = 0.0
+        for period_index in range(payroll_calendar.get_current_period_index()):
+            summary = summarize_period(payroll_calendar, 'test', period_index)
+            totals = payroll_calendar.get_total_hours(summary.start_day, summary.end_day)
+            self.assertTrue(np.allclose(np.frombuffer(summary.preset) + np.frombuffer(summary.added), list(totals.values())))
+            overtime_total += np.frombuffer(summary.overtime).sum()
+        self.assertGreater(overtime_total, 0)
+        # Summed over whole periods, every week is counted exactly once
+        first_week = get_week_start(payroll_calendar.start_day + 6)
+        last_day = payroll_calendar.get_period_range(payroll_calendar.get_current_period_index() - 1)[1]
+        self.assertAlmostEqual(overtime_total, sum(payroll_calendar.get_week_overtime(employee_id, week_start)[1]
+                                                   for employee_id in payroll_calendar.employees
+                                                   for week_start in range(first_week, last_day + 1, 7)))
+
+    def test_worker_pool_matches_a_single_process(self):
+        first_period, last_period = get_year_periods(self.payroll_calendar, self.year)
+        start_day = self.payroll_calendar.get_period_range(first_period)[0]
+        end_day = self.payroll_calendar.get_period_range(last_period)[1]
+        expected = self.payroll_calendar.get_total_hours(start_day, end_day)
+        reports = [close_year(self.registry, ['test'], self.year, workers=workers, chunk_size=2)['test'] for workers in (1, 2)]
+        for report in reports:
+            self.assertEqual(sorted(report.periods), list(range(first_period, last_period + 1)))
+            self.assertTrue(np.allclose(report.preset + report.added, [expected[employee_id] for employee_id in report.employee_ids]))
+        self.assertTrue(np.allclose(reports[0].overtime, reports[1].overtime))
+
+if __name__ == "__main__":
+    unittest.main()
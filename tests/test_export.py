@@ -0,0 +1,63 @@
+import csv
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_payroll_state import QuietTestCase, make_calendar, apply_history
+from WolfPayrollCold import ColdStore
+from WolfPayrollDays import format_day
+from WolfPayrollExport import CSV_HEADER, export_periods
+
+class ExportTest(QuietTestCase):
+    def setUp(self):
+        super().setUp()
+        self.payroll_calendar = make_calendar()
+        self.payroll_calendar.attach_cold_store(ColdStore(os.path.join(self.directory.name, 'test.cold')))
+        apply_history(self.payroll_calendar)
+        self.path = os.path.join(self.directory.name, 'export')
+
+    def tearDown(self):
+        self.payroll_calendar.close()
+        super().tearDown()
+
+    def read_text(self, first_period, last_period):
+        export_periods(self.payroll_calendar, first_period, last_period, self.path)
+        with open(self.path, encoding='utf-8') as export_file:
+            return export_file.read()
+
+    def read_rows(self, first_period, last_period):
+        export_periods(self.payroll_calendar, first_period, last_period, self.path, 'csv')
+        with open(self.path, newline='', encoding='utf-8') as export_file:
+            return list(csv.reader(export_file))
+
+    def test_csv_totals_match_the_calendar(self):
+        rows = self.read_rows(1, 3)
+        self.assertEqual(rows[0], CSV_HEADER)
+        for period_index in range(1, 4):
+            start_day, end_day = self.payroll_calendar.get_period_range(period_index)
+            period_rows = [row for row in rows[1:] if row[1] == format_day(start_day)]
+            totals = {row[3]: float(row[8]) for row in period_rows if row[0] == 'total'}
+            self.assertEqual(totals, self.payroll_calendar.get_total_hours(start_day, end_day))
+            for employee_id, total in totals.items():
+                detail = [float(row[6]) + float(row[7]) for row in period_rows if row[0] == 'detail' and row[3] == employee_id]
+                self.assertAlmostEqual(sum(detail), total)
+
+    def test_text_lists_each_period_and_added_hours(self):
+        start_day, end_day = self.payroll_calendar.get_period_range(2)
+        employee_id, day = next((employee_id, day) for day in range(start_day, end_day + 1) for employee_id in self.payroll_calendar.employees
+                                if self.payroll_calendar.get_added_hours(employee_id, day) > 0)
+        text = self.read_text(1, 2)
+        self.assertEqual(text.count("Pay Period: "), 2)
+        self.assertIn(f"Pay Period: {format_day(start_day)} - {format_day(end_day)}\n", text)
+        self.assertIn(f"    Date: {format_day(day)}, Added Hours: {self.payroll_calendar.get_added_hours(employee_id, day)}\n", text)
+
+    def test_frozen_periods_export_the_same(self):
+        text, rows = self.read_text(0, 4), self.read_rows(0, 4)
+        self.payroll_calendar.freeze_through(4)
+        self.assertEqual(self.read_text(0, 4), text)
+        self.assertEqual(self.read_rows(0, 4), rows)
+
+if __name__ == "__main__":
+    unittest.main()
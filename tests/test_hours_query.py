@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_payroll_state import QuietTestCase, make_calendar, apply_history
+from WolfPayrollCold import ColdStore
+from WolfPayrollDays import today, to_date
+
+class QueryHoursTest(QuietTestCase):
+    def setUp(self):
+        super().setUp()
+        self.payroll_calendar = make_calendar()
+        self.payroll_calendar.attach_cold_store(ColdStore(os.path.join(self.directory.name, 'test.cold')))
+        apply_history(self.payroll_calendar)
+        self.payroll_calendar.freeze_through(3)
+
+    def tearDown(self):
+        self.payroll_calendar.close()
+        super().tearDown()
+
+    def check_buckets(self, start_day, end_day, grouping):
+        employee_ids = ['1', '3', '8']
+        results = self.payroll_calendar.query_hours(employee_ids, start_day, end_day, grouping)
+        for employee_id in employee_ids:
+            buckets = results[employee_id]
+            self.assertEqual((buckets[0][0], buckets[-1][1]), (start_day, end_day))
+            for (bucket_start, bucket_end, total), next_bucket in zip(buckets, buckets[1:] + [None]):
+                if next_bucket is not None:
+                    self.assertEqual(next_bucket[0], bucket_end + 1)
+                expected = sum(self.payroll_calendar.get_day_hours(employee_id, day) for day in range(bucket_start, bucket_end + 1))
+                self.assertAlmostEqual(total, expected)
+        return results[employee_ids[0]]
+
+    def test_groupings_match_summed_days(self):
+        # Starts before the calendar and mid-week, crosses frozen and hot periods and ends today
+        start_day, end_day = self.payroll_calendar.start_day - 3, today()
+        self.assertEqual(len(self.check_buckets(start_day, end_day, 'day')), end_day - start_day + 1)
+        self.assertEqual(len(self.check_buckets(start_day, end_day, 'total')), 1)
+        for bucket_start, bucket_end, total in self.check_buckets(start_day, end_day, 'week')[1:-1]:
+            self.assertEqual((to_date(bucket_start).weekday(), bucket_end - bucket_start), (0, 6))
+        for bucket_start, bucket_end, total in self.check_buckets(start_day, end_day, 'month')[1:]:
+            self.assertEqual(to_date(bucket_start).day, 1)
+        periods = self.check_buckets(start_day + 10, end_day, 'pay_period')
+        for bucket_start, bucket_end, total in periods[1:]:
+            self.assertEqual(self.payroll_calendar.get_period_range(self.payroll_calendar.get_period_index(bucket_start))[0], bucket_start)
+
+    def test_edits_after_the_first_query_are_counted(self):
+        self.check_buckets(today() - 20, today(), 'week')
+        self.payroll_calendar.add_hours('1', today() - 2, 3.0)
+        self.payroll_calendar.remove_hours('3', today() - 9, 2.0)
+        self.check_buckets(today() - 20, today(), 'week')
+
+    def test_unknown_grouping_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.payroll_calendar.query_hours(['1'], today() - 7, today(), 'year')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_payroll_state import QuietTestCase, make_calendar
+from WolfPayrollDays import today, get_week_start
+from WolfPayrollOvertime import OVERTIME_THRESHOLD
+
+class OvertimeTest(QuietTestCase):
+    def setUp(self):
+        super().setUp()
+        self.payroll_calendar = make_calendar()
+        self.week_start = get_week_start(today()) - 7
+
+    def get_summed_week(self, employee_id):
+        return sum(self.payroll_calendar.get_day_hours(employee_id, day) for day in range(self.week_start, self.week_start + 7))
+
+    def test_split_at_the_threshold(self):
+        overtime_index = self.payroll_calendar.overtime_index
+        self.assertEqual(overtime_index.split_hours(38.0), (38.0, 0.0))
+        self.assertEqual(overtime_index.split_hours(OVERTIME_THRESHOLD), (OVERTIME_THRESHOLD, 0.0))
+        self.assertEqual(overtime_index.split_hours(46.5), (OVERTIME_THRESHOLD, 6.5))
+
+    def test_weeks_over_the_threshold_are_reported(self):
+        payroll_calendar = self.payroll_calendar
+        scheduled_hours = self.get_summed_week('1')
+        self.assertLessEqual(scheduled_hours, OVERTIME_THRESHOLD)
+        self.assertEqual(payroll_calendar.get_overtime(self.week_start, self.week_start + 6, ['1']), {})
+        extra_hours = OVERTIME_THRESHOLD - scheduled_hours + 5.0
+        payroll_calendar.add_hours('1', self.week_start + 2, extra_hours - 2.0)
+        payroll_calendar.add_hours('1', self.week_start + 6, 2.0)
+        self.assertEqual(payroll_calendar.get_week_hours('1', self.week_start + 4), self.get_summed_week('1'))
+        overtime = payroll_calendar.get_overtime(self.week_start - 7, self.week_start + 13, ['1', '2'])
+        self.assertEqual(overtime, {'1': [(self.week_start, OVERTIME_THRESHOLD, 5.0)]})
+        # Taking hours back off brings the week under the threshold again
+        payroll_calendar.remove_hours('1', self.week_start + 6, 2.0)
+        payroll_calendar.remove_hours('1', self.week_start + 2, 3.0)
+        self.assertEqual(payroll_calendar.get_week_overtime('1', self.week_start), (self.get_summed_week('1'), 0.0))
+        self.assertEqual(payroll_calendar.get_overtime(self.week_start, self.week_start + 6), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,297 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from WolfPayrollArchive import PeriodArchive
+from WolfPayrollCalendar import PayrollCalendar, LocationRegistry
+from WolfPayrollCold import ColdStore
+from WolfPayrollConcurrency import LocationLockedError
+from WolfPayrollDays import today, get_week_start, format_day
+from WolfPayrollJournal import PayrollJournal
+from WolfPayrollMatrix import build_period_matrix
+from WolfPayrollTransaction import TransactionError
+
+# Concurrency, the journal and the two on-disk formats, on a small roster that started 30 weeks ago
+ROSTER = [{'id': str(employee_id), 'name': f"Employee {employee_id}",
+           'work_schedule': [8.0 if (employee_id + weekday) % 3 else 0.0 for weekday in range(7)]}
+          for employee_id in range(1, 9)]
+START_DATE = date.fromordinal(today() - 210)
+
+def make_calendar():
+    return PayrollCalendar(START_DATE, roster=ROSTER, location='test')
+
+def apply_history(payroll_calendar, edit_count=300):
+    # Deterministic spread of adds and removes across every period so far
+    employee_ids = list(payroll_calendar.employees)
+    span = today() - payroll_calendar.start_day
+    for number in range(edit_count):
+        employee_id = employee_ids[number % len(employee_ids)]
+        day = payroll_calendar.start_day + (number * 37) % span
+        if number % 3:
+            payroll_calendar.add_hours(employee_id, day, 1.5 + number % 4)
+        else:
+            payroll_calendar.remove_hours(employee_id, day, 2.0)
+    payroll_calendar.commit()
+
+def get_state(payroll_calendar):
+    matrices = [payroll_calendar.get_period_matrix(period_index) for period_index in range(payroll_calendar.get_current_period_index() + 1)]
+    return ([(period_matrix.preset.tolist(), period_matrix.added.tolist()) for period_matrix in matrices],
+            payroll_calendar.get_total_hours(payroll_calendar.start_day, today()))
+
+class QuietTestCase(unittest.TestCase):
+    # PayrollCalendar reports rejected edits with print
+    def setUp(self):
+        self.stdout = contextlib.redirect_stdout(io.StringIO())
+        self.stdout.__enter__()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.stdout.__exit__(None, None, None)
+        self.directory.cleanup()
+
+class ConcurrentWriteTest(QuietTestCase):
+    def test_concurrent_add_and_remove_hours(self):
+        payroll_calendar = make_calendar()
+        day = today()
+        employee_ids = ['1', '2']
+        # Build the totals index first, so it has to follow every change event
+        totals_before = payroll_calendar.get_total_hours(day, day)
+        rounds = 300
+
+        def write():
+            # Each round adds 2 and removes 1, so the removal is always covered by added hours
+            for _ in range(rounds):
+                for employee_id in employee_ids:
+                    payroll_calendar.add_hours(employee_id, day, 2.0)
+                    payroll_calendar.remove_hours(employee_id, day, 1.0)
+
+        threads = [threading.Thread(target=write) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for employee_id in employee_ids:
+            self.assertEqual(payroll_calendar.get_added_hours(employee_id, day), 4 * rounds)
+        totals = payroll_calendar.get_total_hours(day, day)
+        payroll_calendar.rebuild_indexes()
+        self.assertEqual(totals, payroll_calendar.get_total_hours(day, day))
+        for employee_id in employee_ids:
+            self.assertEqual(totals[employee_id], totals_before[employee_id] + 4 * rounds)
+
+class JournalTest(QuietTestCase):
+    def test_replay_after_compaction(self):
+        payroll_calendar = make_calendar()
+        payroll_journal = PayrollJournal(self.directory.name, 'test', commit_interval=0)
+        payroll_journal.attach(payroll_calendar)
+        apply_history(payroll_calendar, 200)
+        payroll_journal.flush()
+        payroll_journal.compact()
+        self.assertTrue(os.path.exists(payroll_journal.snapshot_path))
+        # Edits after the snapshot only exist as journal lines
+        payroll_calendar.add_hours('3', today(), 5.0)
+        payroll_calendar.remove_hours('4', today() - 1, 1.0)
+        expected = get_state(payroll_calendar)
+        payroll_journal.close()
+
+        reloaded = make_calendar()
+        PayrollJournal(self.directory.name, 'test').replay(reloaded)
+        self.assertEqual(get_state(reloaded), expected)
+
+    def test_commit_waits_for_the_group_fsync(self):
+        payroll_calendar = make_calendar()
+        payroll_journal = PayrollJournal(self.directory.name, 'test', commit_interval=0.2)
+        payroll_journal.attach(payroll_calendar)
+        payroll_calendar.add_hours('1', today(), 2.5)
+        payroll_calendar.commit()
+        # Read straight from disk while the journal is still open, as a crash right now would leave it
+        with open(payroll_journal.journal_path, encoding='utf-8') as journal_file:
+            records = [json.loads(line) for line in journal_file]
+        self.assertEqual(records[-1][0], '1')
+        self.assertEqual(records[-1][3], 2.5)
+        payroll_journal.close()
+        self.assertIsNone(payroll_calendar.journal)
+
+    def test_replay_keeps_hours_moved_into_added_hours(self):
+        # Both edits below leave every day's total alone and only move hours from the shift to added hours
+        payroll_calendar = make_calendar()
+        payroll_journal = PayrollJournal(self.directory.name, 'test', commit_interval=0)
+        payroll_journal.attach(payroll_calendar)
+        day = next(day for day in range(today(), today() - 7, -1)
+                   if payroll_calendar.get_work_hours('1', day) > 0 and payroll_calendar.get_work_hours('2', day) > 0)
+        payroll_calendar.switch_shifts('1', '2', day, day)
+        hours = payroll_calendar.get_work_hours('4', day) or 8.0
+        if not payroll_calendar.get_work_hours('4', day):
+            payroll_calendar.set_work_hours('4', day, hours)
+        transaction = payroll_calendar.transaction()
+        transaction.remove_hours('4', day, hours)
+        transaction.add_hours('4', day, hours)
+        transaction.commit()
+        for employee_id in ('1', '2', '4'):
+            self.assertEqual(payroll_calendar.get_work_hours(employee_id, day), 0.0)
+        expected = get_state(payroll_calendar)
+        payroll_journal.close()
+
+        reloaded = make_calendar()
+        PayrollJournal(self.directory.name, 'test').replay(reloaded)
+        self.assertEqual(get_state(reloaded), expected)
+
+class DiskFormatTest(QuietTestCase):
+    def test_archive_round_trip(self):
+        payroll_calendar = make_calendar()
+        apply_history(payroll_calendar)
+        period_archive = PeriodArchive(os.path.join(self.directory.name, 'test.archive'))
+        period_archive.attach(payroll_calendar)
+        last_ended = payroll_calendar.get_current_period_index() - 1
+        for period_index in range(last_ended + 1):
+            archived = period_archive.get_period_matrix(period_index)
+            live = build_period_matrix(payroll_calendar, period_index)
+            self.assertIsNotNone(archived)
+            self.assertEqual(archived.days, live.days)
+            self.assertTrue(np.array_equal(archived.preset, live.preset))
+            self.assertTrue(np.array_equal(archived.added, live.added))
+        self.assertIsNone(period_archive.get_period_matrix(last_ended + 1))
+        period_archive.close()
+
+    def test_rebuilt_archive_leaves_readers_mapped(self):
+        path = os.path.join(self.directory.name, 'test.archive')
+        payroll_calendar = make_calendar()
+        apply_history(payroll_calendar)
+        PeriodArchive(path).attach(payroll_calendar)
+        reader = PeriodArchive(path, read_only=True)
+        reader.attach(make_calendar())
+        before = reader.get_period_matrix(0)
+        # A new hire changes the employee table, so the writer starts a new archive
+        hired = PayrollCalendar(START_DATE, roster=ROSTER + [dict(ROSTER[0], id='9')], location='test')
+        writer = PeriodArchive(path)
+        writer.attach(hired)
+        self.assertEqual(writer.get_period_matrix(0).employee_ids[-1], '9')
+        after = reader.get_period_matrix(0)
+        self.assertTrue(np.array_equal(after.preset, before.preset))
+        self.assertTrue(np.array_equal(after.added, before.added))
+        reader.close()
+        writer.close()
+
+    def test_cold_store_round_trip(self):
+        payroll_calendar = make_calendar()
+        payroll_calendar.attach_cold_store(ColdStore(os.path.join(self.directory.name, 'test.cold')))
+        apply_history(payroll_calendar)
+        expected = get_state(payroll_calendar)
+        last_frozen = payroll_calendar.get_current_period_index() - 2
+        self.assertEqual(payroll_calendar.freeze_through(last_frozen), last_frozen + 1)
+        self.assertEqual(get_state(payroll_calendar), expected)
+        # Frozen days have left hot storage
+        self.assertTrue(all(not payroll_calendar.is_frozen(day) for employee_id, day in payroll_calendar.storage.iter_changed_days()))
+
+        reloaded = make_calendar()
+        reloaded.attach_cold_store(ColdStore(os.path.join(self.directory.name, 'test.cold'), read_only=True))
+        for employee_id, day in payroll_calendar.storage.iter_changed_days():
+            reloaded.write_days({(employee_id, day): (payroll_calendar.get_work_hours(employee_id, day), payroll_calendar.get_added_hours(employee_id, day))})
+        self.assertEqual(reloaded.hot_start_day, payroll_calendar.hot_start_day)
+        self.assertEqual(get_state(reloaded), expected)
+        for period_index in range(last_frozen + 1):
+            preset, added = reloaded.get_period_totals(period_index)
+            period_matrix = reloaded.get_period_matrix(period_index)
+            self.assertTrue(np.allclose(preset, period_matrix.preset.sum(axis=1)))
+            self.assertTrue(np.allclose(added, period_matrix.added.sum(axis=1)))
+
+    def test_indexes_build_from_frozen_changes(self):
+        path = os.path.join(self.directory.name, 'test.cold')
+        payroll_calendar = make_calendar()
+        payroll_calendar.attach_cold_store(ColdStore(path))
+        apply_history(payroll_calendar)
+        payroll_calendar.freeze_through(payroll_calendar.get_current_period_index() - 2)
+        # One employee's weekly rule changes after the freeze; their frozen days keep what was frozen
+        roster = [dict(ROSTER[0], work_schedule=[4.0] * 7)] + ROSTER[1:]
+        for reloaded_roster in (ROSTER, roster):
+            reloaded = PayrollCalendar(START_DATE, roster=reloaded_roster, location='test')
+            reloaded.attach_cold_store(ColdStore(path, read_only=True))
+            reloaded.rebuild_indexes()
+            if reloaded_roster is ROSTER:
+                # Building from the changed-day lists leaves every frozen period's detail on disk
+                self.assertEqual(len(reloaded.cold_store.cache), 0)
+            first_day, last_day = reloaded.start_day, reloaded.hot_start_day - 1
+            totals = reloaded.get_total_hours(first_day, last_day)
+            for employee_id in reloaded.employees:
+                expected = sum(reloaded.get_day_hours(employee_id, day) for day in range(first_day, last_day + 1))
+                self.assertAlmostEqual(totals[employee_id], expected)
+                week_start = get_week_start(first_day + 28)
+                self.assertAlmostEqual(reloaded.get_week_hours(employee_id, week_start),
+                                       sum(reloaded.get_day_hours(employee_id, day) for day in range(week_start, week_start + 7)))
+            for day in range(first_day, last_day + 1, 5):
+                self.assertEqual(reloaded.get_day_coverage(day)[0], sum(1 for employee_id in reloaded.employees if reloaded.get_day_hours(employee_id, day) > 0))
+            reloaded.close()
+
+class FrozenPeriodTest(QuietTestCase):
+    def setUp(self):
+        super().setUp()
+        self.payroll_calendar = make_calendar()
+        self.payroll_calendar.attach_cold_store(ColdStore(os.path.join(self.directory.name, 'test.cold')))
+        apply_history(self.payroll_calendar)
+        self.payroll_calendar.freeze_through(2)
+        self.day = self.payroll_calendar.get_period_range(1)[0]
+
+    def test_edits_to_frozen_days_are_rejected(self):
+        payroll_calendar = self.payroll_calendar
+        before = get_state(payroll_calendar)
+        payroll_calendar.add_hours('1', self.day, 4.0)
+        payroll_calendar.remove_hours('1', self.day, 1.0)
+        payroll_calendar.switch_shifts('1', '2', self.day, today())
+        with self.assertRaises(ValueError):
+            payroll_calendar.set_added_hours('1', self.day, 4.0)
+        transaction = payroll_calendar.transaction()
+        transaction.add_hours('1', today(), 1.0)
+        transaction.add_hours('1', self.day, 1.0)
+        with self.assertRaises(TransactionError):
+            transaction.commit()
+        self.assertEqual(get_state(payroll_calendar), before)
+
+    def test_rejected_switch_reports_why(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.payroll_calendar.switch_shifts('1', '2', self.day, today())
+        self.assertIn(f"{format_day(self.day)} is in a closed pay period", output.getvalue())
+
+    def test_only_ended_periods_freeze(self):
+        with self.assertRaises(ValueError):
+            self.payroll_calendar.freeze_through(self.payroll_calendar.get_current_period_index())
+
+    def test_read_only_cold_store_cannot_freeze(self):
+        reader = make_calendar()
+        reader.attach_cold_store(ColdStore(os.path.join(self.directory.name, 'test.cold'), read_only=True))
+        self.assertTrue(reader.is_frozen(self.day))
+        with self.assertRaises(ValueError):
+            reader.freeze_through(3)
+
+class LocationLockTest(QuietTestCase):
+    def test_second_writer_is_refused(self):
+        locations_directory = os.path.join(self.directory.name, 'locations')
+        data_directory = os.path.join(self.directory.name, 'data')
+        os.makedirs(locations_directory)
+        with open(os.path.join(locations_directory, 'test.json'), 'w', encoding='utf-8') as location_file:
+            json.dump({'name': 'Test', 'start_date': START_DATE.isoformat(), 'employees': ROSTER, 'freeze_after_days': None}, location_file)
+        writer = LocationRegistry(locations_directory, data_directory)
+        writer.get('test')
+        second_writer = LocationRegistry(locations_directory, data_directory)
+        reader = LocationRegistry(locations_directory, data_directory, read_only=True)
+        try:
+            with self.assertRaises(LocationLockedError):
+                second_writer.get('test')
+            reader.get('test')
+        finally:
+            reader.close()
+            second_writer.close()
+            writer.close()
+
+if __name__ == "__main__":
+    unittest.main()
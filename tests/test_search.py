@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_payroll_state import QuietTestCase, START_DATE
+from WolfPayrollCalendar import PayrollCalendar
+
+NAMES = ["John Smith", "Joan Baker", "Mary Johnson", "Peter Smithers", "Ann Lee", "Bob Marley", "Lee Ann Jones"]
+ROSTER = [{'id': str(number), 'name': name, 'work_schedule': [8.0] * 5 + [0.0] * 2}
+          for number, name in zip((1, 2, 10, 12, 21, 3, 30), NAMES)]
+
+class SearchTest(QuietTestCase):
+    def setUp(self):
+        super().setUp()
+        self.payroll_calendar = PayrollCalendar(START_DATE, roster=ROSTER, location='test')
+
+    def search(self, query):
+        return self.payroll_calendar.search_employees(query)
+
+    def test_empty_query_lists_the_roster(self):
+        self.assertEqual(self.search("  "), ['1', '2', '10', '12', '21', '3', '30'])
+
+    def test_prefixes_of_ids_and_name_words(self):
+        self.assertEqual(self.search("1"), ['1', '10', '12'])
+        self.assertEqual(self.search("jo"), ['1', '2', '10', '30'])
+        self.assertEqual(self.search("SMITH"), ['1', '12'])
+        self.assertEqual(self.search("mary johnson"), ['10'])
+        self.assertEqual(self.search("zed"), [])
+
+    def test_every_word_has_to_match(self):
+        self.assertEqual(self.search("ann lee"), ['21', '30'])
+        self.assertEqual(self.search("smith jo"), ['1'])
+        self.assertEqual(self.search("lee 3"), ['30'])
+        self.assertEqual(self.search("bob smith"), [])
+
+if __name__ == "__main__":
+    unittest.main()
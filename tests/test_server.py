@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_batch import write_location
+from test_payroll_state import QuietTestCase
+from WolfPayrollCalendar import LocationRegistry
+from WolfPayrollDays import today, format_day
+from WolfPayrollServer import PayrollServer, PayrollClient, PayrollClientError, API_DATE_FORMAT
+
+class ServerTest(QuietTestCase):
+    def setUp(self):
+        super().setUp()
+        locations_directory, data_directory = write_location(self.directory.name, freeze_after_days=None)
+        self.registry = LocationRegistry(locations_directory, data_directory)
+        self.server = PayrollServer(self.registry, port=0)
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.server.start())
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+        self.client = PayrollClient(f"http://127.0.0.1:{self.server.port}", timeout=60)
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.run_until_complete(self.server.close())
+        self.loop.close()
+        self.registry.close()
+        super().tearDown()
+
+    def make_records(self, count):
+        day = format_day(today(), API_DATE_FORMAT)
+        return [{'action': 'add', 'employee_id': str(number % 8 + 1), 'date': day, 'hours': 0.25} for number in range(count)]
+
+    def test_write_is_on_disk_when_answered(self):
+        self.client.apply_batch('test', self.make_records(40))
+        # The journal is still open; what a crash would leave behind is already in the file
+        with open(self.registry.journals['test'].journal_path, encoding='utf-8') as journal_file:
+            self.assertEqual(len(journal_file.readlines()), 8)
+        self.assertEqual(self.client.get_totals('test', today(), today(), ['1'])['1'],
+                         self.registry.get('test').get_scheduled_hours('1', today()) + 5 * 0.25)
+
+    def test_rejected_batch_applies_nothing(self):
+        records = self.make_records(3) + [{'action': 'remove', 'employee_id': '1', 'date': format_day(today(), API_DATE_FORMAT), 'hours': 500}]
+        with self.assertRaises(PayrollClientError) as raised:
+            self.client.apply_batch('test', records)
+        self.assertEqual(raised.exception.status, 409)
+        self.assertEqual(self.registry.get('test').get_added_hours('1', today()), 0)
+
+    def test_reads_are_answered_while_a_batch_commits(self):
+        finished = []
+        writer = threading.Thread(target=lambda: finished.append((self.client.apply_batch('test', self.make_records(12000)), time.perf_counter())))
+        writer.start()
+        read_times = []
+        while writer.is_alive() and len(read_times) < 200:
+            self.client.get_period('test')
+            read_times.append(time.perf_counter())
+        writer.join()
+        self.assertEqual(finished[0][0]['operations'], 12000)
+        # Reads were answered before the batch finished, not queued behind it
+        self.assertGreater(sum(1 for read_time in read_times if read_time < finished[0][1]), 1)
+
+if __name__ == "__main__":
+    unittest.main()
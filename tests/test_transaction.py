@@ -0,0 +1,69 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_payroll_state import QuietTestCase, make_calendar, get_state
+from WolfPayrollDays import today, format_day
+from WolfPayrollTransaction import TransactionError
+
+class TransactionTest(QuietTestCase):
+    def setUp(self):
+        super().setUp()
+        self.payroll_calendar = make_calendar()
+        # A recent day where employee 1 works and employee 2 does not
+        self.day = next(day for day in range(today(), today() - 7, -1)
+                        if self.payroll_calendar.get_work_hours('1', day) > 0 and not self.payroll_calendar.get_work_hours('2', day))
+
+    def test_operations_see_the_ones_before_them(self):
+        transaction = self.payroll_calendar.transaction()
+        transaction.add_hours('1', self.day, 2.0)
+        transaction.remove_hours('1', self.day, 10.0)
+        self.assertEqual(transaction.commit(), 1)
+        self.assertEqual(self.payroll_calendar.get_day_hours('1', self.day), 0)
+
+    def test_every_problem_is_reported_and_nothing_applied(self):
+        before = get_state(self.payroll_calendar)
+        transaction = self.payroll_calendar.transaction()
+        transaction.add_hours('1', self.day, 2.0)
+        transaction.add_hours('99', self.day, 2.0)
+        transaction.remove_hours('2', self.day, 1.0)
+        transaction.add_hours('1', self.day, -1.0)
+        with self.assertRaises(TransactionError) as raised:
+            transaction.commit()
+        self.assertEqual(raised.exception.errors, [
+            "operation 2: unknown employee ID '99'",
+            f"operation 3: cannot remove 1.0 hours, only 0.0 hours on {format_day(self.day)} for 2",
+            "operation 4: hours must be positive, got -1.0",
+        ])
+        self.assertEqual(get_state(self.payroll_calendar), before)
+
+    def test_switch_moves_both_shifts(self):
+        hours = self.payroll_calendar.get_work_hours('1', self.day)
+        other_day = next(day for day in range(self.day - 1, self.day - 8, -1) if self.payroll_calendar.get_work_hours('2', day) > 0
+                         and not self.payroll_calendar.get_work_hours('1', day))
+        other_hours = self.payroll_calendar.get_work_hours('2', other_day)
+        with self.payroll_calendar.transaction() as transaction:
+            transaction.switch_shifts('1', '2', self.day, other_day)
+        self.assertEqual(transaction.switched, [(hours, other_hours)])
+        self.assertEqual((self.payroll_calendar.get_day_hours('1', self.day), self.payroll_calendar.get_day_hours('1', other_day)), (0, other_hours))
+        self.assertEqual((self.payroll_calendar.get_day_hours('2', self.day), self.payroll_calendar.get_day_hours('2', other_day)), (hours, 0))
+
+    def test_block_that_raises_applies_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with self.payroll_calendar.transaction() as transaction:
+                transaction.add_hours('1', self.day, 2.0)
+                raise RuntimeError()
+        self.assertEqual(self.payroll_calendar.get_added_hours('1', self.day), 0)
+
+    def test_extend_valid_skips_only_the_rejected(self):
+        transaction = self.payroll_calendar.transaction()
+        rejected = transaction.extend_valid([('add', '2', self.day, 3.0), ('remove', '2', self.day, 4.0),
+                                             ('remove', '2', self.day, 1.0), ('move', '2', self.day, 1.0)])
+        self.assertEqual([position for position, error in rejected], [1, 3])
+        self.assertEqual(transaction.commit(), 1)
+        self.assertEqual(self.payroll_calendar.get_added_hours('2', self.day), 2.0)
+
+if __name__ == "__main__":
+    unittest.main()